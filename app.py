@@ -1,4 +1,5 @@
 from flask import Flask, render_template, request, jsonify
+from werkzeug.wrappers import Response
 import plotly.graph_objs as go
 import plotly.utils
 import json
@@ -53,6 +54,12 @@ DARK_THEME = {
     'line_color': '#00d4ff'
 }
 
+# Shared font definition referenced by every chart axis and legend
+CHART_FONT = {
+    'family': 'Avenir, Helvetica Neue, Arial, sans-serif',
+    'weight': 400
+}
+
 def parse_tenor_expression(expression):
     """Parse expressions containing tenor syntax like aud.2y1y-aud.1y1y or aud.130526.1y"""
     # Find all tenor syntax patterns in the expression (updated for new fixed-date format)
@@ -96,32 +103,48 @@ def parse_expression(expression, data_cache):
     
     return parsed_expr
 
+RANGE_LOOKBACK_DAYS = {
+    '1M': 30,
+    '3M': 90,
+    '6M': 180,
+    '1Y': 365,
+    '3Y': 365*3,
+    '5Y': 365*5,
+    '10Y': 365*10
+}
+
+def _range_bounds(range_filter, end_date):
+    """Return (start_date, end_date) for a range filter, or None if no filtering applies"""
+    days = RANGE_LOOKBACK_DAYS.get(range_filter)
+    if days is None or end_date is None:
+        return None
+    
+    return end_date - timedelta(days=days), end_date
+
 def filter_data_by_range(df, range_filter):
     """Filter dataframe by date range"""
     if range_filter == 'MAX' or df is None or df.empty:
         return df
     
-    end_date = df['Date'].max()
-    
-    if range_filter == '1M':
-        start_date = end_date - timedelta(days=30)
-    elif range_filter == '3M':
-        start_date = end_date - timedelta(days=90)
-    elif range_filter == '6M':
-        start_date = end_date - timedelta(days=180)
-    elif range_filter == '1Y':
-        start_date = end_date - timedelta(days=365)
-    elif range_filter == '3Y':
-        start_date = end_date - timedelta(days=365*3)
-    elif range_filter == '5Y':
-        start_date = end_date - timedelta(days=365*5)
-    elif range_filter == '10Y':
-        start_date = end_date - timedelta(days=365*10)
-    else:
+    bounds = _range_bounds(range_filter, df['Date'].max())
+    if bounds is None:
         return df
     
+    start_date, _ = bounds
     return df[df['Date'] >= start_date]
 
+def filter_dates_by_range(dates, range_filter):
+    """Filter a set of dates by range before any per-date work is done on them"""
+    if range_filter == 'MAX' or not dates:
+        return dates
+    
+    bounds = _range_bounds(range_filter, max(dates))
+    if bounds is None:
+        return dates
+    
+    min_d, max_d = bounds
+    return {date for date in dates if min_d <= date <= max_d}
+
 def calculate_total_trade_pnl(trade):
     """Calculate total P&L for a trade using existing positions"""
     try:
@@ -613,6 +636,9 @@ def update_chart():
                             else:
                                 common_dates = common_dates.intersection(set(df['Date']))
                         
+                        # Restrict to the requested range before evaluating each date
+                        common_dates = filter_dates_by_range(common_dates, range_filter)
+                        
                         if not common_dates:
                             continue
                         
@@ -710,6 +736,9 @@ def update_chart():
                                 else:
                                     common_dates = common_dates.intersection(set(data_cache[cache_key]['Date']))
                         
+                        # Restrict to the requested range before evaluating each date
+                        common_dates = filter_dates_by_range(common_dates, range_filter)
+                        
                         if not common_dates:
                             continue
                         
@@ -792,14 +821,8 @@ def update_chart():
                 linecolor=DARK_THEME['grid_color'],  # Add border to x-axis
                 linewidth=1,
                 mirror=True,  # Add border to top of chart
-                tickfont=dict(
-                    family='Avenir, Helvetica Neue, Arial, sans-serif',
-                    weight=400
-                ),
-                titlefont=dict(
-                    family='Avenir, Helvetica Neue, Arial, sans-serif',
-                    weight=400
-                ),
+                tickfont=CHART_FONT,
+                titlefont=CHART_FONT,
                 rangeslider=dict(
                     visible=True,
                     bgcolor=DARK_THEME['plot_bgcolor'],
@@ -821,21 +844,14 @@ def update_chart():
                 zeroline=False,  # Remove white line at zero
                 autorange=True,  # Enable auto-scaling based on visible data
                 fixedrange=False,  # Allow y-axis to adjust when x-axis range changes
-                tickfont=dict(
-                    family='Avenir, Helvetica Neue, Arial, sans-serif',
-                    weight=400
-                ),
-                titlefont=dict(
-                    family='Avenir, Helvetica Neue, Arial, sans-serif',
-                    weight=400
-                )
+                tickfont=CHART_FONT,
+                titlefont=CHART_FONT
             ),
             plot_bgcolor=DARK_THEME['plot_bgcolor'],
             paper_bgcolor=DARK_THEME['paper_bgcolor'],
             font=dict(
                 color=DARK_THEME['font_color'],
-                family='Avenir, Helvetica Neue, Arial, sans-serif',
-                weight=400
+                **CHART_FONT
             ),
             hovermode='x unified',
             showlegend=True,
@@ -845,10 +861,7 @@ def update_chart():
                 y=0.98,  # Position at top of chart area
                 xanchor="right",
                 x=0.98,  # Position at right of chart area
-                font=dict(
-                    family='Avenir, Helvetica Neue, Arial, sans-serif',
-                    weight=400
-                ),
+                font=CHART_FONT,
                 bgcolor="rgba(30, 30, 30, 0.9)",  # Semi-transparent background
                 bordercolor="#333333",
                 borderwidth=1
@@ -870,14 +883,8 @@ def update_chart():
                 linewidth=1,
                 tickformat='.3f',  # Display 3 decimal places
                 zeroline=False,  # Remove white line at zero
-                tickfont=dict(
-                    family='Avenir, Helvetica Neue, Arial, sans-serif',
-                    weight=400
-                ),
-                titlefont=dict(
-                    family='Avenir, Helvetica Neue, Arial, sans-serif',
-                    weight=400
-                )
+                tickfont=CHART_FONT,
+                titlefont=CHART_FONT
             )
         
         fig.update_layout(**layout_config)
@@ -885,10 +892,9 @@ def update_chart():
         # Convert to JSON
         graphJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
         
-        return jsonify({
-            'success': True,
-            'chart': graphJSON
-        })
+        # graphJSON is already valid JSON, so embed it directly instead of re-escaping it via jsonify
+        body = b'{"success":true,"chart":' + graphJSON.encode() + b'}'
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,12 +1,17 @@
 import os
-import glob
 import re
+import json
 from datetime import datetime, timedelta
 import pandas as pd
+import numpy as np
 from cba.analytics import xcurves as xc
 import threading
 import time
 import sys
+import logging
+import atexit
+import itertools
+from collections import Counter
 
 # Add the printing_scripts directory to the path to import serializers
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,6 +19,27 @@ printing_scripts_path = os.path.join(script_dir, '..', 'printing_scripts')
 if printing_scripts_path not in sys.path:
     sys.path.append(printing_scripts_path)
 
+# Per-file messages go to the debug log; progress is printed every PROGRESS_EVERY curves
+logger = logging.getLogger(__name__)
+PROGRESS_EVERY = 100
+
+# Number of dates whose curves may be loaded ahead of the bundle builder
+PREFETCH_DEPTH = 3
+
+# Optional zstd compression of serialised core bundles (*_core_bundle.json.zst)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+# Write .json.zst bundles instead of plain JSON; set with --compress
+COMPRESS_CORE_BUNDLES = False
+CORE_BUNDLE_SUFFIXES = ('_core_bundle.json', '_core_bundle.json.zst')
+
+# Valid curve and core bundle filenames, e.g. 250101_aud_curve.json / 250101_core_bundle.json
+_FNAME_RE = re.compile(r'^(\d{6})_[a-z]{3}_curve\.json$')
+_CORE_FNAME_RE = re.compile(r'^(\d{6})_core_bundle\.json(?:\.zst)?$')
+
 # Dates to exclude from serialization (hardcoded)
 EXCLUDED_DATES = {'900104', '930826', '900102'}
 
@@ -49,17 +75,151 @@ CURRENCY_CONFIG = {
     }
 }
 
+# Three-letter uppercase codes used when building block bundles
+CURRENCY_UPPER = {currency: currency[:3].upper() for currency in CURRENCY_CONFIG}
+
+# Resolved data folders: when script is in the_dash/, currency folders are ../{currency}_curves
+FOLDER_PATHS = {currency: os.path.normpath(os.path.join(script_dir, '..', config['folder']))
+                for currency, config in CURRENCY_CONFIG.items()}
+CORE_CURVES_DIR = os.path.normpath(os.path.join(script_dir, '..', 'core_curves'))
+
+# FX rates passed to every block bundle build (historical and realtime_curves' live bundle)
+FX_PAIR_RATES = (("AUDUSD", "1"), ("EURUSD", "1"), ("USDJPY", "1"), ("USDCAD", "1"), ("NZDUSD", "1"), ("GBPUSD", "1"))
+
 def yymmdd_to_datetime(date_str: str) -> datetime:
     """Convert YYMMDD to datetime object"""
-    yy, mm, dd = int(date_str[:2]), int(date_str[2:4]), int(date_str[4:6])
-    # Handle dates starting with 9 as 1990s (90-99 -> 1990-1999)
-    year = 1900 + yy if yy >= 90 else 2000 + yy
-    return datetime(year, mm, dd)
+    # One int() over the whole date, then split it arithmetically
+    yy, mmdd = divmod(int(date_str[:6]), 10000)
+    mm, dd = divmod(mmdd, 100)
+    # Handle dates starting with 9 as 1990s (90-99 -> 1990-1999); yy // 90 is 1 only for those
+    return datetime(2000 + yy - (yy // 90) * 100, mm, dd)
+
+def yymmdd_sort_key(date_str: str) -> str:
+    """Chronologically sortable key for a YYMMDD string (90-99 -> 1990s), no datetime needed"""
+    return ('19' if date_str[0] == '9' else '20') + date_str
 
 def datetime_to_yymmdd(date_obj: datetime) -> str:
     """Convert datetime object to YYMMDD string"""
     return date_obj.strftime('%y%m%d')
 
+def yymmdd_array_to_datetime(date_strs) -> pd.DatetimeIndex:
+    """Convert an array of YYMMDD strings to datetimes in one vectorised pass (invalid -> NaT)"""
+    arr = np.asarray(date_strs, dtype='U6')
+    # Same century rule as yymmdd_to_datetime: 90-99 -> 1990s, otherwise 2000s
+    century = np.where(arr >= '90', '19', '20')
+    return pd.to_datetime(np.char.add(century, arr), format='%Y%m%d', errors='coerce')
+
+def _most_recent(date_strs, max_days: int = None) -> list:
+    """
+    Select the most recent YYMMDD strings without fully sorting the whole set
+    
+    Args:
+        date_strs: Iterable of date strings (YYMMDD); invalid dates are dropped
+        max_days: Number of dates to keep (default: all)
+    
+    Returns:
+        list: Date strings sorted by date (most recent first)
+    """
+    date_arr = np.fromiter(date_strs, dtype='U6')
+    date_values = yymmdd_array_to_datetime(date_arr)
+    valid = ~date_values.isna()
+    date_arr = date_arr[valid]
+    values = date_values.values[valid]
+    
+    # Partition out the top max_days in O(N), then only sort those
+    if max_days is not None and max_days < len(values):
+        if max_days <= 0:
+            return []
+        top = np.argpartition(values, -max_days)[-max_days:]
+        date_arr, values = date_arr[top], values[top]
+    
+    order = np.argsort(values)[::-1]
+    return date_arr[order].tolist()
+
+# Inventory of curve files per currency, persisted next to the core bundles:
+# {currency: {'mtime': float, 'names': {date_str: [filename, ...]}}}
+# Folder mtime only catches added/removed files, and coarsely on network shares, so
+# lookups that miss rescan the folder once (see _has_curve_file)
+INVENTORY_CACHE_PATH = os.path.join(CORE_CURVES_DIR, '.inventory_cache.json')
+_inventory_cache = None
+
+def _load_inventory_cache():
+    """Load the on-disk inventory cache (empty if missing or unreadable)"""
+    try:
+        with open(INVENTORY_CACHE_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_inventory_cache():
+    """Write the inventory cache back to disk (skipped if core_curves does not exist yet)"""
+    if not os.path.isdir(os.path.dirname(INVENTORY_CACHE_PATH)):
+        return
+    try:
+        with open(INVENTORY_CACHE_PATH, 'w') as f:
+            json.dump(_inventory_cache, f)
+    except OSError as e:
+        print(f"⚠️ Could not save inventory cache: {e}")
+
+def _inventory(currency: str, refresh: bool = False):
+    """
+    Get the curve files available for a currency, rescanning the folder only if it changed
+    
+    Args:
+        currency: Currency code
+        refresh: Rescan the folder even if its mtime is unchanged
+    
+    Returns:
+        dict: {date_str: [filename, ...]} for the curve files, or None if the folder does not exist
+    """
+    global _inventory_cache
+    if _inventory_cache is None:
+        _inventory_cache = _load_inventory_cache()
+    
+    folder_path = FOLDER_PATHS[currency]
+    
+    try:
+        mtime = os.stat(folder_path).st_mtime
+    except OSError:
+        return None
+    
+    cached = _inventory_cache.get(currency)
+    if not refresh and cached and cached.get('mtime') == mtime and 'names' in cached:
+        return cached['names']
+    
+    inventory = {}
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            m = _FNAME_RE.match(entry.name)
+            if m:
+                inventory.setdefault(m.group(1), []).append(entry.name)
+    
+    _inventory_cache[currency] = {'mtime': mtime, 'names': inventory}
+    _save_inventory_cache()
+    return inventory
+
+def _has_curve_file(inventories: dict, refreshed: set, currency: str, date_str: str, filename: str) -> bool:
+    """
+    Check the inventory for a curve file, rescanning the currency's folder once on a miss
+    
+    Args:
+        inventories: {currency: inventory} to look up and refresh in place
+        refreshed: Currencies already rescanned during this lookup pass
+        currency: Currency code
+        date_str: Date string (YYMMDD)
+        filename: Curve filename expected for the date
+    
+    Returns:
+        bool: True if the file is in the (possibly refreshed) inventory
+    """
+    if filename in inventories[currency].get(date_str, ()):
+        return True
+    if currency in refreshed:
+        return False
+    refreshed.add(currency)
+    inventories[currency] = _inventory(currency, refresh=True) or {}
+    return filename in inventories[currency].get(date_str, ())
+
 def get_all_dates(currencies: list, max_days: int = 200):
     """
     Get all dates across all specified currencies (union of all date sets)
@@ -82,25 +242,14 @@ def get_all_dates(currencies: list, max_days: int = 200):
             print(f"⚠️ Skipping unsupported currency: {currency}")
             continue
             
-        config = CURRENCY_CONFIG[currency]
-        # When script is in the_dash/, currency folders are ../{currency}_curves
-        folder_path = os.path.join(script_dir, '..', config['folder'])
+        inventory = _inventory(currency)
         
-        if not os.path.exists(folder_path):
-            print(f"❌ Folder not found: {folder_path}")
+        if inventory is None:
+            print(f"❌ Folder not found: {FOLDER_PATHS[currency]}")
             continue
         
-        curve_files = glob.glob(os.path.join(folder_path, "*.json"))
-        
         # Extract dates for this currency
-        dates = set()
-        for filepath in curve_files:
-            filename = os.path.basename(filepath)
-            try:
-                date_str = filename[:6]
-                dates.add(date_str)
-            except:
-                continue
+        dates = set(inventory)
         
         currency_dates[currency] = dates
         all_dates.update(dates)  # Add to union of all dates
@@ -120,18 +269,8 @@ def get_all_dates(currencies: list, max_days: int = 200):
     
     print(f"📅 Found {len(all_dates)} total unique dates across all currencies (after exclusions)")
     
-    # Convert to datetime objects, sort by date (most recent first), and take max_days
-    date_objects = []
-    for date_str in all_dates:
-        try:
-            date_obj = yymmdd_to_datetime(date_str)
-            date_objects.append((date_obj, date_str))
-        except:
-            continue
-    
-    # Sort by date (most recent first) and take max_days
-    date_objects.sort(key=lambda x: x[0], reverse=True)
-    selected_dates = [date_str for _, date_str in date_objects[:max_days]]
+    # Take the max_days most recent dates (most recent first)
+    selected_dates = _most_recent(all_dates, max_days)
     
     print(f"🎯 Selected {len(selected_dates)} most recent dates")
     if selected_dates:
@@ -141,80 +280,285 @@ def get_all_dates(currencies: list, max_days: int = 200):
     
     return selected_dates
 
+# Shared thread pool for all parallel curve I/O in this module
+_IO_POOL = None
+_IO_POOL_LOCK = threading.Lock()
+
+def _get_pool():
+    """Get the module's persistent thread pool, creating it on first use"""
+    global _IO_POOL
+    with _IO_POOL_LOCK:
+        if _IO_POOL is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _IO_POOL = ThreadPoolExecutor(max_workers=min(32, 4 * (os.cpu_count() or 1)),
+                                          thread_name_prefix='curve-io')
+            atexit.register(_IO_POOL.shutdown)
+        return _IO_POOL
+
+# Curve names already deserialised into xcurves memory during this process
+_LOADED_CURVES = set()
+
+def _deserialise_one(currency: str, date_str: str, filepath: str, curve_name: str):
+    """Deserialise a single curve file into xcurves memory (no-op if it is already loaded)"""
+    if curve_name not in _LOADED_CURVES:
+        xc.Deserialise(filepath, curve_name, True, True)
+        _LOADED_CURVES.add(curve_name)
+    return currency, date_str, curve_name
+
+def _curve_load_tasks(currencies: list, dates: list, total_operations: int):
+    """
+    Build the list of curve files to deserialise for each (date, currency) pair
+    
+    Args:
+        currencies: List of currency codes
+        dates: List of date strings (YYMMDD)
+        total_operations: Total (date, currency) pairs, used for progress output
+    
+    Returns:
+        tuple: (tasks, skipped) where tasks are (currency, date_str, filepath, curve_name)
+    """
+    tasks = []
+    skipped = 0
+    
+    unsupported = [currency for currency in currencies if currency not in CURRENCY_CONFIG]
+    if unsupported:
+        print(f"  ⚠️ Skipping unsupported currencies: {', '.join(unsupported)}")
+    
+    # Each currency's inventory is looked up once (one folder stat), not once per date
+    inventories = {
+        currency: _inventory(currency) or {}
+        for currency in currencies if currency in CURRENCY_CONFIG
+    }
+    refreshed = set()
+    
+    # for date in dates: for currency in currencies:
+    for date_str in dates:
+        for currency in currencies:
+            if currency not in CURRENCY_CONFIG:
+                skipped += 1
+                continue
+            
+            # Build filename
+            filename = f"{date_str}_{currency}_curve.json"
+            filepath = os.path.join(FOLDER_PATHS[currency], filename)
+            
+            if not _has_curve_file(inventories, refreshed, currency, date_str, filename):
+                skipped += 1
+                logger.debug("File not found: %s", filename)
+                continue
+            
+            curve_name = f"{date_str}_{currency}_curve"  # Use unique curve name
+            tasks.append((currency, date_str, filepath, curve_name))
+    
+    missing = skipped - len(unsupported) * len(dates)
+    if missing:
+        print(f"  ❌ {missing}/{total_operations} curve files not found")
+    
+    return tasks, skipped
+
+def _report_progress(current: int, total: int):
+    """Print loading progress every PROGRESS_EVERY curves and on the last one"""
+    if current % PROGRESS_EVERY == 0 or current == total:
+        print(f"  [{current:3d}/{total}] curves processed")
+
 def load_all_curves(currencies: list, dates: list):
     """
     Load all curves for all currencies and dates into memory
     Following the pattern: for date in dates: for currency in currencies: curve = deserialise
+    The deserialise calls are I/O bound, so they are dispatched to a thread pool
     
     Args:
         currencies: List of currency codes
         dates: List of date strings (YYMMDD)
     
     Returns:
-        dict: curves[currency][date] = curve_name
+        dict: curves[(currency, date)] = curve_name
     """  
+    from concurrent.futures import as_completed
+    
     curves = {}
+    loaded_per_currency = Counter()
     total_operations = len(dates) * len(currencies)
-    current_operation = 0
     
-    # Initialize curves dictionary
-    for currency in currencies:
-        curves[currency] = {}
+    tasks, current_operation = _curve_load_tasks(currencies, dates, total_operations)
     
-    # First loop: for date in dates:
-    for date_str in dates:
-        print(f"\n📅 Processing date: {date_str}")
+    # Deserialize the curves concurrently (this loads them into xcurves memory)
+    executor = _get_pool()
+    future_to_task = {
+        executor.submit(_deserialise_one, *task): task
+        for task in tasks
+    }
+    
+    for future in as_completed(future_to_task):
+        currency, date_str, filepath, _ = future_to_task[future]
+        current_operation += 1
         
-        # Second loop: for currency in currencies:
-        for currency in currencies:
-            current_operation += 1
+        try:
+            _, _, curve_name = future.result()
             
-            if currency not in CURRENCY_CONFIG:
-                print(f"  ⚠️ [{current_operation:3d}/{total_operations}] Skipping unsupported currency: {currency}")
-                continue
+            # Store in curves dictionary
+            curves[(currency, date_str)] = curve_name
+            loaded_per_currency[currency] += 1
             
-            config = CURRENCY_CONFIG[currency]
+            logger.debug("[%d/%d] Loaded %s: %s", current_operation, total_operations, currency.upper(), os.path.basename(filepath))
             
-            try:
-                # Build filename
-                filename = f"{date_str}_{currency}_curve.json"
-                # When script is in the_dash/, currency folders are ../{currency}_curves
-                filepath = os.path.join(script_dir, '..', config['folder'], filename)
-                
-                if not os.path.exists(filepath):
-                    print(f"  ❌ [{current_operation:3d}/{total_operations}] File not found: {filename}")
-                    continue
-                
-                # Deserialize the curve (this loads it into xcurves memory)
-                curve_name = f"{date_str}_{currency}_curve"  # Use unique curve name
-                xc.Deserialise(filepath, curve_name, True, True)
-                
-                # Store in curves dictionary
-                curves[currency][date_str] = curve_name
-                
-                print(f"  ✅ [{current_operation:3d}/{total_operations}] Loaded {currency.upper()}: {filename}")
-                
-            except Exception as e:
-                print(f"  ❌ [{current_operation:3d}/{total_operations}] Error loading {currency.upper()} {date_str}: {e}")
-                continue
+        except Exception as e:
+            print(f"  ❌ [{current_operation:3d}/{total_operations}] Error loading {currency.upper()} {date_str}: {e}")
+        
+        _report_progress(current_operation, total_operations)
     
     # Summary
-    total_loaded = sum(len(curves[currency]) for currency in curves)
     print(f"\n📊 Curve Loading Summary:")
     for currency in currencies:
-        loaded_count = len(curves[currency])
-        print(f"  {currency.upper()}: {loaded_count}/{len(dates)} curves loaded")
-    print(f"  TOTAL: {total_loaded}/{total_operations} curves loaded")
+        print(f"  {currency.upper()}: {loaded_per_currency[currency]}/{len(dates)} curves loaded")
+    print(f"  TOTAL: {sum(loaded_per_currency.values())}/{total_operations} curves loaded")
     
     return curves
 
+def _build_bundle(date_str: str, curves: dict, currencies: list, core_curves_dir: str):
+    """
+    Build and serialise the core bundle for a single date
+    
+    Args:
+        date_str: Date string (YYMMDD)
+        curves: Dictionary of loaded curves keyed by (currency, date)
+        currencies: List of currency codes
+        core_curves_dir: Directory the core bundle is written to
+    
+    Returns:
+        dict: Processing result for this date ('status' is 'success', 'skipped' or 'error')
+    """
+    try:           
+        # Get curve set for this date: curves[:, date]
+        currency_list = []
+        curve_names = []
+        
+        # Include all currencies that have a curve for this date
+        for currency in currencies:
+            curve_name = curves.get((currency, date_str))
+            if curve_name:
+                currency_list.append(CURRENCY_UPPER[currency])  # 3 letters uppercase
+                curve_names.append(curve_name)
+        
+        if not currency_list:
+            print(f"  ⚠️ No curves available for date {date_str}")
+            return {'date': date_str, 'status': 'skipped'}
+        
+        currency_curve_pairs = [[ccy, curve_name] for ccy, curve_name in zip(currency_list, curve_names)]
+        
+        # Build the block bundle
+        bundle_name = f"{date_str}_core"
+        xc.BuildBlockBundle(bundle_name, currency_curve_pairs, FX_PAIR_RATES)
+        
+        # Serialize the core bundle
+        core_filename = f"{date_str}_core_bundle.json"
+        core_filepath = os.path.join(core_curves_dir, core_filename)
+        # Write to a temporary file and rename so readers never see a partial bundle
+        tmp_filepath = core_filepath + '.tmp'
+        xc.Serialise(bundle_name, tmp_filepath, True)
+        _fsync_file(tmp_filepath)
+        os.replace(tmp_filepath, core_filepath)
+        if COMPRESS_CORE_BUNDLES and ZSTD_AVAILABLE:
+            core_filename = _compress_bundle(core_filepath)
+        
+        logger.debug("Saved core bundle: %s", core_filename)
+        
+        return {
+            'date': date_str,
+            'bundle_name': bundle_name,
+            'currencies': currency_list,
+            'filename': core_filename,
+            'status': 'success'
+        }
+        
+    except Exception as e:
+        print(f"  ❌ Error building bundle for {date_str}: {e}")
+        return {
+            'date': date_str,
+            'bundle_name': f"{date_str}_core",
+            'currencies': [],
+            'filename': None,
+            'status': 'error',
+            'error': str(e)
+        }
+
+def _fsync_file(filepath: str):
+    """Flush a written file's data to disk before it is renamed into place"""
+    with open(filepath, 'rb+') as f:
+        os.fsync(f.fileno())
+
+def _fsync_dir(dirpath: str):
+    """Flush a directory's entries (the renames into it) to disk; not supported on Windows"""
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _compress_bundle(core_filepath: str) -> str:
+    """Replace a serialised bundle with a zstd-compressed copy and return the new filename"""
+    with open(core_filepath, 'rb') as f:
+        data = f.read()
+    compressed_path = core_filepath + '.zst'
+    # Same temporary-file-and-rename as the JSON, and the JSON goes only once the .zst is in place
+    tmp_path = compressed_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(zstandard.ZstdCompressor(level=3).compress(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, compressed_path)
+    os.remove(core_filepath)
+    return os.path.basename(compressed_path)
+
+def _release_date_curves(date_str: str, curves: dict, currencies: list):
+    """
+    Forget a date's curves once its bundle has been serialised: removes them from curves
+    (modified in place) and from _LOADED_CURVES, so a later build deserialises them afresh
+    xcurves has no documented single-curve unload, so the curves themselves stay in
+    xcurves native memory, which grows with every date loaded in this process
+    """
+    for currency in currencies:
+        curve_name = curves.pop((currency, date_str), None)
+        if curve_name:
+            _LOADED_CURVES.discard(curve_name)
+
+def _summarise_bundles(bundle_results: list, core_curves_dir: str):
+    """Flush the written bundles to disk, print the summary and return the processing results dict"""
+    # Each bundle was fsynced before its rename; one directory fsync makes the renames durable
+    _fsync_dir(core_curves_dir)
+    
+    processed_bundles = [result for result in bundle_results if result['status'] != 'skipped']
+    success_count = sum(1 for result in processed_bundles if result['status'] == 'success')
+    error_count = len(bundle_results) - success_count
+    
+    # Summary
+    total = success_count + error_count
+    success_rate = (success_count / total * 100) if total > 0 else 0
+    
+    print(f"\n📊 Bundle Building Summary:")
+    print(f"  ✅ Success: {success_count}/{total} ({success_rate:.1f}%)")
+    print(f"  ❌ Errors:  {error_count}/{total}")
+    print(f"  💾 Core bundles saved to: {core_curves_dir}")
+    
+    return {
+        'success_count': success_count,
+        'error_count': error_count,
+        'success_rate': success_rate,
+        'bundles': processed_bundles
+    }
+
 def build_core_bundles(curves: dict, dates: list, currencies: list):
     """
     Build block bundles for each date using all available currencies
     Following the pattern from initialize_curves
     
     Args:
-        curves: Dictionary of loaded curves
+        curves: Dictionary of loaded curves keyed by (currency, date)
         dates: List of date strings (YYMMDD)
         currencies: List of currency codes
     
@@ -225,92 +569,140 @@ def build_core_bundles(curves: dict, dates: list, currencies: list):
     print("=" * 60)
     
     # Create core_curves directory relative to app.py location
-    # When script is in the_dash/, core_curves should be ../core_curves from there
-    core_curves_dir = os.path.join(script_dir, '..', 'core_curves')
+    core_curves_dir = CORE_CURVES_DIR
     os.makedirs(core_curves_dir, exist_ok=True)
     
-    success_count = 0
-    error_count = 0
-    processed_bundles = []
+    # Process each date; xcurves builds are not known to be thread-safe, so one at a time
+    bundle_results = [_build_bundle(date_str, curves, currencies, core_curves_dir) for date_str in dates]
     
-    # Process each date
-    for i, date_str in enumerate(dates, 1):
-        try:           
-            # Get curve set for this date: curves[:, date]
-            currency_list = []
-            curve_names = []
-            
-            # Include all currencies that have a curve for this date
-            for currency in currencies:
-                if currency in curves and date_str in curves[currency]:
-                    currency_list.append(currency[:3].upper())  # 3 letters uppercase
-                    curve_names.append(curves[currency][date_str])
-            
-            if not currency_list:
-                print(f"  ⚠️ No curves available for date {date_str}")
-                error_count += 1
-                continue
-            
-           
-            currency_curve_pairs = []
-            for j in range(len(currency_list)):
-                currency_curve_pairs.append([currency_list[j], curve_names[j]])
-            
-            fx_pair_rates = [["AUDUSD", "1"], ["EURUSD", "1"], ["USDJPY", "1"], ["USDCAD", "1"], ["NZDUSD", "1"], ["GBPUSD", "1"]]
-            
-            # Build the block bundle
-            bundle_name = f"{date_str}_core"
-            xc.BuildBlockBundle(bundle_name, currency_curve_pairs, fx_pair_rates)
-            
-            # Serialize the core bundle
-            core_filename = f"{date_str}_core_bundle.json"
-            core_filepath = os.path.join(core_curves_dir, core_filename)
-            xc.Serialise(bundle_name, core_filepath, True)
+    return _summarise_bundles(bundle_results, core_curves_dir)
+
+def load_and_build_core_bundles(currencies: list, dates: list):
+    """
+    Load curves and build core bundles as a pipeline
+    Curves are deserialised on a thread pool up to PREFETCH_DEPTH dates ahead of a
+    single build thread; as soon as every curve for a date has been loaded, that date
+    is handed to the builder which builds and serialises its bundle and then forgets
+    the date's curves, freeing a prefetch slot for the next date. PREFETCH_DEPTH only
+    limits how far loading runs ahead: loaded curves stay in xcurves native memory
+    (see _release_date_curves)
+    
+    Args:
+        currencies: List of currency codes
+        dates: List of date strings (YYMMDD)
+    
+    Returns:
+        dict: Processing results (same shape as build_core_bundles)
+    """
+    import queue
+    
+    print(f"\n🔗 Loading curves and building core bundles...")
+    print("=" * 60)
+    
+    # Create core_curves directory relative to app.py location
+    core_curves_dir = CORE_CURVES_DIR
+    os.makedirs(core_curves_dir, exist_ok=True)
+    
+    curves = {}
+    load_errors = []
+    total_operations = len(dates) * len(currencies)
+    
+    tasks, skipped = _curve_load_tasks(currencies, dates, total_operations)
+    
+    # Group the load tasks by date, keeping the date order
+    tasks_by_date = {date_str: [] for date_str in dates}
+    for task in tasks:
+        tasks_by_date[task[1]].append(task)
+    
+    # Completion counters; next() on an itertools.count is atomic, so the load callbacks
+    # never take a lock. A date is ready to build when its count reaches its task count
+    finished_per_date = {date_str: itertools.count(1) for date_str in dates}
+    operation_counter = itertools.count(skipped + 1)
+    finished_counter = itertools.count(1)
+    loads_done = threading.Event()
+    
+    ready_dates = queue.Queue()
+    prefetch_slots = threading.BoundedSemaphore(PREFETCH_DEPTH)
+    bundle_results = []
+    
+    def build_worker():
+        """Build bundles for dates as their curves finish loading"""
+        while True:
+            date_str = ready_dates.get()
+            if date_str is None:
+                break
+            bundle_results.append(_build_bundle(date_str, curves, currencies, core_curves_dir))
             
-            print(f"  💾 Saved core bundle: {core_filename}")
+            # The inputs for this date are no longer needed once its bundle is serialised
+            # (curves is this pipeline's own dict)
+            _release_date_curves(date_str, curves, currencies)
+            prefetch_slots.release()
+    
+    def on_loaded(future, task):
+        """Record a finished load and queue its date once all of the date's curves are in"""
+        currency, date_str, filepath, curve_name = task
+        try:
+            error = future.exception()
+            current_operation = next(operation_counter)
             
-            processed_bundles.append({
-                'date': date_str,
-                'bundle_name': bundle_name,
-                'currencies': currency_list,
-                'filename': core_filename,
-                'status': 'success'
-            })
-            success_count += 1
+            if error is None:
+                curves[(currency, date_str)] = curve_name
+                logger.debug("[%d/%d] Loaded %s: %s", current_operation, total_operations, currency.upper(), os.path.basename(filepath))
+            else:
+                load_errors.append(currency)
+                print(f"  ❌ [{current_operation:3d}/{total_operations}] Error loading {currency.upper()} {date_str}: {error}")
+            _report_progress(current_operation, total_operations)
+        finally:
+            # Done-callback exceptions are swallowed by the executor, so the bookkeeping
+            # must always run or the builder and loads_done.wait() would hang
+            if next(finished_per_date[date_str]) == len(tasks_by_date[date_str]):
+                ready_dates.put(date_str)
             
-        except Exception as e:
-            print(f"  ❌ Error building bundle for {date_str}: {e}")
-            processed_bundles.append({
-                'date': date_str,
-                'bundle_name': f"{date_str}_core",
-                'currencies': [],
-                'filename': None,
-                'status': 'error',
-                'error': str(e)
-            })
-            error_count += 1
+            # Counted only after the date has been queued, so the sentinel always comes last
+            if next(finished_counter) == len(tasks):
+                loads_done.set()
     
-    # Summary
-    total = success_count + error_count
-    success_rate = (success_count / total * 100) if total > 0 else 0
+    builder = threading.Thread(target=build_worker, daemon=True)
+    builder.start()
     
-    print(f"\n📊 Bundle Building Summary:")
-    print(f"  ✅ Success: {success_count}/{total} ({success_rate:.1f}%)")
-    print(f"  ❌ Errors:  {error_count}/{total}")
-    print(f"  💾 Core bundles saved to: {core_curves_dir}")
+    executor = _get_pool()
+    for date_str, date_tasks in tasks_by_date.items():
+        # Wait until a builder has room before reading another date's curves
+        prefetch_slots.acquire()
+        
+        # Dates with nothing to load go straight to the builder
+        if not date_tasks:
+            ready_dates.put(date_str)
+            continue
+        
+        for task in date_tasks:
+            future = executor.submit(_deserialise_one, *task)
+            future.add_done_callback(lambda f, task=task: on_loaded(f, task))
     
-    return {
-        'success_count': success_count,
-        'error_count': error_count,
-        'success_rate': success_rate,
-        'bundles': processed_bundles
-    }
+    # Every date has been queued once the last load has been recorded
+    if tasks:
+        loads_done.wait()
+    
+    ready_dates.put(None)
+    builder.join()
+    
+    # Curves are released as their bundles are built, so count loads from the tasks
+    loaded_counts = Counter(task[0] for task in tasks)
+    loaded_counts.subtract(load_errors)
+    
+    # Summary
+    print(f"\n📊 Curve Loading Summary:")
+    for currency in currencies:
+        print(f"  {currency.upper()}: {loaded_counts[currency]}/{len(dates)} curves loaded")
+    print(f"  TOTAL: {sum(loaded_counts.values())}/{total_operations} curves loaded")
+    
+    return _summarise_bundles(bundle_results, core_curves_dir)
 
 def process_core_curves(currencies: list = None, max_days: int = 200):
     """
     Main function to process core curves following the correct pattern:
     1. Load all curves for all currencies and dates
-    2. Build block bundles for each date
+    2. Build block bundles for each date as soon as its curves are loaded
     
     Args:
         currencies: List of currency codes (default: all available)
@@ -330,11 +722,8 @@ def process_core_curves(currencies: list = None, max_days: int = 200):
     # Step 1: Find all dates across all currencies
     dates = get_all_dates(currencies, max_days)
     
-    # Step 2: Load all curves into memory
-    curves = load_all_curves(currencies, dates)
-    
-    # Step 3: Build core bundles for each date
-    bundle_results = build_core_bundles(curves, dates, currencies)
+    # Step 2 & 3: Load curves and build core bundles for each date as a pipeline
+    bundle_results = load_and_build_core_bundles(currencies, dates)
     
     # Overall summary
     print("\n" + "=" * 70)
@@ -345,7 +734,7 @@ def process_core_curves(currencies: list = None, max_days: int = 200):
     print(f"Core bundles created: {bundle_results['success_count']}")
     print(f"Errors: {bundle_results['error_count']}")
     print(f"Success rate: {bundle_results['success_rate']:.1f}%")
-    print(f"Output directory: {os.path.join(script_dir, '..', 'core_curves')}")
+    print(f"Output directory: {CORE_CURVES_DIR}")
     print("=" * 70)
     
     return {
@@ -361,32 +750,19 @@ def list_available_curves():
     print("=" * 50)
     
     for currency in CURRENCY_CONFIG.keys():
-        config = CURRENCY_CONFIG[currency]
-        # When script is in the_dash/, currency folders are ../{currency}_curves
-        folder_path = os.path.join(script_dir, '..', config['folder'])
+        inventory = _inventory(currency)
         
-        if not os.path.exists(folder_path):
+        if inventory is None:
             print(f"{currency.upper():4s}: Folder not found")
             continue
-            
-        curve_files = glob.glob(os.path.join(folder_path, "*.json"))
         
-        if curve_files:
+        if inventory:
             # Extract dates and find range
-            dates = []
-            for filepath in curve_files:
-                filename = os.path.basename(filepath)
-                try:
-                    date_str = filename[:6]
-                    date_obj = yymmdd_to_datetime(date_str)
-                    dates.append(date_obj)
-                except:
-                    continue
+            dates = yymmdd_array_to_datetime(list(inventory)).dropna()
             
-            if dates:
-                dates.sort()
-                oldest_date = dates[0]
-                newest_date = dates[-1]
+            if len(dates):
+                oldest_date = dates.min()
+                newest_date = dates.max()
                 print(f"{currency.upper():4s}: {len(dates):4d} files ({oldest_date.strftime('%Y-%m-%d')} to {newest_date.strftime('%Y-%m-%d')})")
             else:
                 print(f"{currency.upper():4s}: No valid date files found")
@@ -400,14 +776,15 @@ def get_most_recent_core_bundle():
     Returns:
         tuple: (date_str, filepath) of the most recent bundle, or (None, None) if none found
     """
-    core_curves_dir = os.path.join(script_dir, '..', 'core_curves')
+    core_curves_dir = CORE_CURVES_DIR
     
     if not os.path.exists(core_curves_dir):
         print(f"❌ Core curves directory not found: {core_curves_dir}")
         return None, None
     
-    # Find all core bundle files
-    bundle_files = glob.glob(os.path.join(core_curves_dir, "*_core_bundle.json"))
+    # Find all core bundle files (one directory pass for both suffixes)
+    with os.scandir(core_curves_dir) as entries:
+        bundle_files = [entry.path for entry in entries if entry.name.endswith(CORE_BUNDLE_SUFFIXES)]
     
     if not bundle_files:
         print(f"❌ No core bundle files found in: {core_curves_dir}")
@@ -416,33 +793,32 @@ def get_most_recent_core_bundle():
     # Extract dates and find the most recent
     bundle_dates = []
     for filepath in bundle_files:
-        filename = os.path.basename(filepath)
-        try:
-            date_str = filename[:6]  # Extract YYMMDD
-            date_obj = yymmdd_to_datetime(date_str)
-            bundle_dates.append((date_obj, date_str, filepath))
-        except:
-            continue
+        m = _CORE_FNAME_RE.match(os.path.basename(filepath))
+        if m:
+            bundle_dates.append((m.group(1), filepath))
     
     if not bundle_dates:
         print(f"❌ No valid core bundle dates found")
         return None, None
     
-    # Sort by date (most recent first)
-    bundle_dates.sort(key=lambda x: x[0], reverse=True)
-    most_recent_date_obj, most_recent_date_str, most_recent_filepath = bundle_dates[0]
+    # Most recent by sort key; only the winner is converted to a datetime
+    most_recent_date_str, most_recent_filepath = max(bundle_dates, key=lambda x: yymmdd_sort_key(x[0]))
+    most_recent_date_obj = yymmdd_to_datetime(most_recent_date_str)
     
     print(f"📅 Most recent core bundle: {most_recent_date_str} ({most_recent_date_obj.strftime('%Y-%m-%d')})")
     print(f"📁 File: {os.path.basename(most_recent_filepath)}")
     
     return most_recent_date_str, most_recent_filepath
 
-def get_missing_core_bundle_dates():
+def get_missing_core_bundle_dates(max_dates: int = None):
     """
     Find dates that exist in individual currency curves but not in core_curves
     
+    Args:
+        max_dates: Maximum number of missing dates to return (default: all)
+    
     Returns:
-        set: Set of date strings (YYMMDD) that need core bundles created
+        list: Date strings (YYMMDD) that need core bundles created (most recent first)
     """
     print("🔍 Finding dates that need core bundles...")
     
@@ -452,59 +828,41 @@ def get_missing_core_bundle_dates():
     
     for currency in currencies:
         config = CURRENCY_CONFIG[currency]
-        folder_path = os.path.join(script_dir, '..', config['folder'])
+        inventory = _inventory(currency)
         
-        if not os.path.exists(folder_path):
+        if inventory is None:
             print(f"  ⚠️ Folder not found: {config['folder']}")
             continue
         
-        curve_files = glob.glob(os.path.join(folder_path, "*.json"))
-        currency_dates = set()
-        
-        for filepath in curve_files:
-            filename = os.path.basename(filepath)
-            try:
-                date_str = filename[:6]  # Extract YYMMDD
-                currency_dates.add(date_str)
-                all_currency_dates.add(date_str)
-            except:
-                continue
+        currency_dates = set(inventory)
+        all_currency_dates.update(currency_dates)
         
         print(f"  {currency.upper()}: {len(currency_dates)} dates found")
     
     print(f"📊 Total unique dates across all currencies: {len(all_currency_dates)}")
     
     # Get existing core bundle dates
-    core_curves_dir = os.path.join(script_dir, '..', 'core_curves')
+    core_curves_dir = CORE_CURVES_DIR
     existing_core_dates = set()
     
     if os.path.exists(core_curves_dir):
-        core_files = glob.glob(os.path.join(core_curves_dir, "*_core_bundle.json"))
-        for filepath in core_files:
-            filename = os.path.basename(filepath)
-            try:
-                date_str = filename[:6]  # Extract YYMMDD
-                existing_core_dates.add(date_str)
-            except:
-                continue
+        with os.scandir(core_curves_dir) as it:
+            for entry in it:
+                m = _CORE_FNAME_RE.match(entry.name)
+                if m:
+                    existing_core_dates.add(m.group(1))
     
     print(f"📊 Existing core bundle dates: {len(existing_core_dates)}")
     
-    # Find missing dates and exclude hardcoded dates
-    missing_dates = all_currency_dates - existing_core_dates - EXCLUDED_DATES
-    
-    if missing_dates:
-        # Sort missing dates (most recent first)
-        missing_date_objects = []
-        for date_str in missing_dates:
-            try:
-                date_obj = yymmdd_to_datetime(date_str)
-                missing_date_objects.append((date_obj, date_str))
-            except:
-                continue
-        
-        missing_date_objects.sort(key=lambda x: x[0], reverse=True)
-        sorted_missing_dates = [date_str for _, date_str in missing_date_objects]
+    # Find missing dates and exclude hardcoded dates (vectorised set difference)
+    all_arr = np.fromiter(all_currency_dates, dtype='U6', count=len(all_currency_dates))
+    done_arr = np.union1d(np.fromiter(existing_core_dates, dtype='U6', count=len(existing_core_dates)),
+                          np.fromiter(EXCLUDED_DATES, dtype='U6', count=len(EXCLUDED_DATES)))
+    missing_dates = np.setdiff1d(all_arr, done_arr, assume_unique=True)
+    
+    if len(missing_dates):
+        # Sort missing dates (most recent first), keeping only max_dates if capped
+        sorted_missing_dates = _most_recent(missing_dates, max_dates)
         
         print(f"🎯 Missing core bundle dates: {len(missing_dates)}")
         if sorted_missing_dates:
@@ -512,40 +870,39 @@ def get_missing_core_bundle_dates():
             oldest_missing = yymmdd_to_datetime(sorted_missing_dates[-1])
             print(f"📅 Date range: {oldest_missing.strftime('%Y-%m-%d')} to {newest_missing.strftime('%Y-%m-%d')}")
         
-        return set(sorted_missing_dates)
+        return sorted_missing_dates
     else:
         print("✅ No missing core bundle dates found - all dates are up to date!")
-        return set()
+        return []
 
-def serialize_missing_core_curves():
+def serialize_missing_core_curves(max_dates: int = 50):
     """
     Find missing core bundle dates and serialize core curves for those dates
+    
+    Args:
+        max_dates: Maximum number of missing dates to build (most recent first)
     """
     print("=" * 70)
     print("🎯 SERIALIZING MISSING CORE CURVES")
     print("=" * 70)
     
     # Step 1: Find dates that need core bundles
-    missing_dates = get_missing_core_bundle_dates()
+    missing_dates = get_missing_core_bundle_dates(max_dates=max_dates)  # Limit to the most recent
     
     if not missing_dates:
         print("✅ All core bundles are up to date!")
         return True
     
-    # Convert to list and limit to reasonable number
-    missing_dates_list = list(missing_dates)[:50]  # Limit to 50 most recent
+    missing_dates_list = list(missing_dates)
     
     print(f"\n🎯 Will create core bundles for {len(missing_dates_list)} dates")
     print(f"Auto-proceeding with core bundle creation...")
     
-    # Step 2: Load all curves for missing dates
+    # Step 2 & 3: Load curves for missing dates and build core bundles as they finish loading
     currencies = list(CURRENCY_CONFIG.keys())
     print(f"\n📂 Loading curves for currencies: {', '.join(currencies).upper()}")
     
-    curves = load_all_curves(currencies, missing_dates_list)
-    
-    # Step 3: Build core bundles for missing dates
-    bundle_results = build_core_bundles(curves, missing_dates_list, currencies)
+    bundle_results = load_and_build_core_bundles(currencies, missing_dates_list)
     
     # Summary
     print(f"\n✅ Core curve serialization completed!")
@@ -554,17 +911,44 @@ def serialize_missing_core_curves():
     
     return bundle_results['success_count'] > 0
 
-def main():
-    """Main function for core curve serializer"""
+def main(mode: str = 'missing', max_days: int = None, compress: bool = False):
+    """
+    Main function for core curve serializer
+    
+    Args:
+        mode: 'missing' to build bundles only for dates without one, 'process' to rebuild the most recent dates
+        max_days: Maximum number of dates to build (default: 50 for 'missing', 200 for 'process')
+        compress: Write zstd-compressed bundles (requires the zstandard package)
+    """
+    global COMPRESS_CORE_BUNDLES
+    if compress and not ZSTD_AVAILABLE:
+        print("⚠️ zstandard is not installed, writing uncompressed bundles")
+    COMPRESS_CORE_BUNDLES = compress and ZSTD_AVAILABLE
+    
+    if mode == 'process':
+        process_core_curves(max_days=max_days or 200)
+        return
+    
     # Auto-run missing core curves serialization (most common use case)
     print("🎯 Auto-running missing core curves serialization...")
     
     # Serialize missing core curves
-    success = serialize_missing_core_curves()
+    success = serialize_missing_core_curves(max_dates=max_days or 50)
     if success:
         print(f"\n✅ Missing core curve serialization completed successfully!")
     else:
         print(f"\n❌ Missing core curve serialization failed")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build core curve bundles from single-currency curves")
+    parser.add_argument('--mode', choices=['missing', 'process'], default='missing',
+                        help="'missing' builds bundles for dates without one; 'process' rebuilds the most recent dates")
+    parser.add_argument('--max-days', type=int, default=None,
+                        help="Maximum number of dates to build (default: 50 for missing, 200 for process)")
+    parser.add_argument('--compress', action='store_true',
+                        help="Write zstd-compressed .json.zst bundles (requires zstandard)")
+    args = parser.parse_args()
+    
+    main(mode=args.mode, max_days=args.max_days, compress=args.compress)
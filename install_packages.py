@@ -5,21 +5,41 @@ Swap Analytics Dashboard - Package Installation Script
 This script installs all required Python packages for the dashboard
 using CBA's internal artifactory repository.
 
-Usage: python install_packages.py
+Usage: python install_packages.py [--wheelhouse DIR]
 """
 
 import subprocess
 import sys
 import importlib
+import importlib.util
 import os
-from typing import List, Tuple
+import re
+import shutil
+import site
+import tempfile
+import threading
+from typing import List, NamedTuple, Tuple
 
 # CBA-specific pip configuration
 PIP_INDEX_URL = "https://artifactory.internal.cba/api/pypi/org.python.pypi/simple"
 TRUSTED_HOST = "artifactory.internal.cba"
 
+# Local wheel cache so repeat installs skip downloads and source builds
+PIP_CACHE_DIR = os.path.expanduser("~/.cache/swap-dashboard/pip")
+
+# When set, installs come only from this directory of prebuilt wheels
+WHEELHOUSE_DIR = None
+
+# uv is used instead of pip when it is on the PATH
+UV_PATH = shutil.which("uv")
+
+class RequiredPackage(NamedTuple):
+    """A pip package and the name it is imported by"""
+    package_name: str
+    import_name: str
+
 # Required packages with their import names
-REQUIRED_PACKAGES = [
+_ALL_PACKAGES = [
     ("Flask", "flask"),
     ("pandas", "pandas"),
     ("numpy", "numpy"),
@@ -30,6 +50,16 @@ REQUIRED_PACKAGES = [
     ("futures", "concurrent.futures")  # For older Python versions
 ]
 
+# The futures backport is only needed (or installable) before Python 3.2
+REQUIRED_PACKAGES = tuple(
+    RequiredPackage(package_name, import_name)
+    for package_name, import_name in _ALL_PACKAGES
+    if not (package_name == "futures" and sys.version_info >= (3, 2))
+)
+
+# Memoised verify_package results, keyed by import name
+_verify_cache = {}
+
 # Built-in modules to verify
 BUILTIN_MODULES = [
     "threading",
@@ -57,6 +87,46 @@ def print_section(title: str):
     print(f"\n{title}")
     print("-" * len(title))
 
+def pip_install_command(package_names: List[str]) -> List[str]:
+    """
+    Build the install command for the given packages, using uv when available
+    
+    Args:
+        package_names: Names of packages to install
+    
+    Returns:
+        List[str]: Command line to run
+    """
+    if WHEELHOUSE_DIR is not None:
+        source = ["--no-index", f"--find-links={WHEELHOUSE_DIR}"]
+    elif UV_PATH is None:
+        source = [f"--index-url={PIP_INDEX_URL}", f"--trusted-host={TRUSTED_HOST}"]
+    else:
+        source = ["--index-url", PIP_INDEX_URL, "--allow-insecure-host", TRUSTED_HOST]
+    
+    if UV_PATH is None:
+        return [
+            sys.executable, "-m", "pip", "install",
+            "--user",
+            "--prefer-binary",
+            f"--cache-dir={PIP_CACHE_DIR}",
+            *source,
+            *package_names
+        ]
+    
+    cmd = [
+        UV_PATH, "pip", "install",
+        "--python", sys.executable,
+        "--cache-dir", PIP_CACHE_DIR,
+        *source,
+    ]
+    
+    # uv has no --user; outside a virtualenv install into the user site instead
+    if sys.prefix == sys.base_prefix:
+        cmd += ["--target", site.getusersitepackages()]
+    
+    return cmd + list(package_names)
+
 def install_package(package_name: str, display_name: str = None) -> bool:
     """
     Install a package using CBA's pip configuration
@@ -73,36 +143,154 @@ def install_package(package_name: str, display_name: str = None) -> bool:
     
     print(f"Installing {display_name}...")
     
-    cmd = [
-        sys.executable, "-m", "pip", "install", package_name,
-        "--user",
-        f"--index-url={PIP_INDEX_URL}",
-        f"--trusted-host={TRUSTED_HOST}"
-    ]
+    cmd = pip_install_command([package_name])
     
     try:
-        result = subprocess.run(
+        # close_fds=False with an absolute executable lets CPython spawn via posix_spawn
+        process = subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=300  # 5 minute timeout per package
+            close_fds=False
         )
+        _, stderr = process.communicate(timeout=300)  # 5 minute timeout per package
         
-        if result.returncode == 0:
+        if process.returncode == 0:
             print(f"✓ {display_name} installed successfully")
             return True
         else:
-            print(f"✗ Failed to install {display_name}")
-            print(f"  Error: {result.stderr.strip()}")
+            print(f"✗ Failed to install {display_name}\n  Error: {stderr.strip()}")
             return False
             
     except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
         print(f"✗ Installation of {display_name} timed out")
         return False
     except Exception as e:
         print(f"✗ Error installing {display_name}: {str(e)}")
         return False
 
+def build_wheelhouse(directory: str, package_names: List[str]) -> bool:
+    """
+    Download or build wheels for the given packages into a local directory
+    
+    Args:
+        directory: Directory to write the wheels to
+        package_names: Names of packages to build wheels for
+    
+    Returns:
+        bool: True if every wheel was built, False otherwise
+    """
+    print_section("Building Wheelhouse")
+    print(f"Writing wheels to {directory}")
+    os.makedirs(directory, exist_ok=True)
+    
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as requirements:
+        requirements.write("\n".join(package_names) + "\n")
+    
+    cmd = [
+        sys.executable, "-m", "pip", "wheel",
+        f"--wheel-dir={directory}",
+        "--prefer-binary",
+        f"--cache-dir={PIP_CACHE_DIR}",
+        f"--index-url={PIP_INDEX_URL}",
+        f"--trusted-host={TRUSTED_HOST}",
+        "-r", requirements.name
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300 * len(package_names))
+        
+        if result.returncode == 0:
+            print(f"✓ Built wheels for {len(package_names)} packages")
+            return True
+        else:
+            print("✗ Failed to build wheelhouse")
+            print(f"  Error: {result.stderr.strip()}")
+            return False
+            
+    except subprocess.TimeoutExpired:
+        print("✗ Building the wheelhouse timed out")
+        return False
+    except Exception as e:
+        print(f"✗ Error building wheelhouse: {str(e)}")
+        return False
+    finally:
+        os.remove(requirements.name)
+
+def _normalize_name(package_name: str) -> str:
+    """Normalize a distribution name the way pip reports it (PEP 503)"""
+    return re.sub(r"[-_.]+", "-", package_name).lower()
+
+def install_packages_batch(package_names: List[str]) -> List[str]:
+    """
+    Install several packages with a single pip invocation
+    
+    Args:
+        package_names: Names of packages to install
+    
+    Returns:
+        List[str]: Packages pip reported as installed or already satisfied
+    """
+    installer = "uv" if UV_PATH else "pip"
+    print(f"Installing {len(package_names)} packages in one {installer} run: {', '.join(package_names)}")
+    
+    cmd = pip_install_command(package_names)
+    
+    wanted = {_normalize_name(name): name for name in package_names}
+    done = set()
+    
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            close_fds=False
+        )
+        
+        # Kill pip if it overruns; reading stdout blocks until EOF, so the deadline
+        # has to be enforced while streaming rather than after it
+        timeout = 300 * len(package_names)
+        timed_out = threading.Event()
+        def _kill_on_timeout():
+            timed_out.set()
+            process.kill()
+        watchdog = threading.Timer(timeout, _kill_on_timeout)
+        watchdog.daemon = True
+        watchdog.start()
+        
+        # Stream pip's output and pick out per-package status as it arrives
+        for line in process.stdout:
+            line = line.rstrip()
+            print(f"  {line}")
+            
+            if line.startswith("Requirement already satisfied:"):
+                name = re.split(r"[\s<>=!~;\[]", line.split(":", 1)[1].strip(), 1)[0]
+                if _normalize_name(name) in wanted:
+                    done.add(wanted[_normalize_name(name)])
+            elif line.startswith("Successfully installed"):
+                for dist in line.split()[2:]:
+                    name = _normalize_name(dist.rsplit("-", 1)[0])
+                    if name in wanted:
+                        done.add(wanted[name])
+        
+        returncode = process.wait()
+        watchdog.cancel()
+        
+        # A clean exit means every requested package is satisfied
+        if timed_out.is_set():
+            print("✗ Batch installation timed out")
+        elif returncode == 0:
+            done.update(package_names)
+        
+    except Exception as e:
+        print(f"✗ Error during batch installation: {str(e)}")
+    
+    return [name for name in package_names if name in done]
+
 def verify_package(import_name: str, display_name: str = None) -> bool:
     """
     Verify that a package can be imported
@@ -117,11 +305,23 @@ def verify_package(import_name: str, display_name: str = None) -> bool:
     if display_name is None:
         display_name = import_name
     
-    try:
-        importlib.import_module(import_name)
+    # Already imported or compiled into the interpreter needs no lookup at all
+    if import_name in sys.modules or import_name in sys.builtin_module_names:
         return True
-    except ImportError:
-        return False
+    
+    if import_name not in _verify_cache:
+        # Locate the module without executing it, which is far cheaper for heavy packages
+        try:
+            _verify_cache[import_name] = importlib.util.find_spec(import_name) is not None
+        except (ImportError, ValueError):
+            _verify_cache[import_name] = False
+    
+    return _verify_cache[import_name]
+
+def clear_verify_cache():
+    """Forget cached verification results after packages have been installed"""
+    _verify_cache.clear()
+    importlib.invalidate_caches()
 
 def install_all_packages() -> Tuple[int, int]:
     """
@@ -134,23 +334,41 @@ def install_all_packages() -> Tuple[int, int]:
     print("Using CBA internal artifactory repository")
     print()
     
-    successful = 0
     total = len(REQUIRED_PACKAGES)
     
-    for i, (package_name, import_name) in enumerate(REQUIRED_PACKAGES, 1):
-        print(f"[{i}/{total}] ", end="")
-        
-        # Check if already installed
+    # Check what is already installed
+    missing = []
+    for package_name, import_name in REQUIRED_PACKAGES:
         if verify_package(import_name):
             print(f"{package_name} is already installed ✓")
-            successful += 1
-            continue
-        
-        # Install the package
-        if install_package(package_name):
-            successful += 1
-        
-        print()  # Add spacing between packages
+        else:
+            missing.append(package_name)
+    
+    successful = total - len(missing)
+    if not missing:
+        return successful, total
+    
+    print()
+    
+    # Install everything missing in one pip run
+    installed = install_packages_batch(missing)
+    clear_verify_cache()
+    for package_name in installed:
+        print(f"✓ {package_name} installed successfully")
+    successful += len(installed)
+    
+    # Retry anything the batch didn't get one at a time; concurrent pip runs would
+    # race on the same site-packages and pip cache
+    failed = [name for name in missing if name not in installed]
+    if failed:
+        print()
+        print(f"Retrying {len(failed)} packages individually")
+        for i, package_name in enumerate(failed, 1):
+            print(f"[{i}/{len(failed)}] ", end="")
+            if install_package(package_name):
+                successful += 1
+            print()  # Add spacing between packages
+        clear_verify_cache()
     
     return successful, total
 
@@ -202,6 +420,9 @@ def print_next_steps():
     print_section("Next Steps")
     print("1. Ensure cba.analytics.xcurves is installed through CBA systems")
     print()
+    if UV_PATH is None:
+        print("   Tip: 'pip install uv' once to make future installs much faster")
+        print()
     print("2. Navigate to the storage directory")
     print("3. Run the application:")
     print("   python app.py")
@@ -218,18 +439,38 @@ def check_python_version():
         print(f"   Current version: {version.major}.{version.minor}.{version.micro}")
         print()
 
-def main():
-    """Main installation function"""
+def main(wheelhouse: str = None):
+    """
+    Main installation function
+    
+    Args:
+        wheelhouse: Optional directory of prebuilt wheels to install from,
+                    built from the index first if it has no wheels yet
+    """
+    global WHEELHOUSE_DIR
+    
     print_header()
     
     # Check Python version
     check_python_version()
     
-    # Install packages
-    successful_installs, total_packages = install_all_packages()
+    if wheelhouse:
+        wheelhouse = os.path.abspath(wheelhouse)
+        has_wheels = os.path.isdir(wheelhouse) and any(name.endswith(".whl") for name in os.listdir(wheelhouse))
+        packages = [package.package_name for package in REQUIRED_PACKAGES]
+        if has_wheels or build_wheelhouse(wheelhouse, packages):
+            WHEELHOUSE_DIR = wheelhouse
     
-    print_section("Installation Summary")
-    print(f"Successfully installed: {successful_installs}/{total_packages} packages")
+    # Install packages, skipping the whole phase when nothing is missing
+    if all(verify_package(package.import_name) for package in REQUIRED_PACKAGES):
+        successful_installs = total_packages = len(REQUIRED_PACKAGES)
+        print_section("Installation Summary")
+        print("All required packages are already installed ✓")
+    else:
+        successful_installs, total_packages = install_all_packages()
+        
+        print_section("Installation Summary")
+        print(f"Successfully installed: {successful_installs}/{total_packages} packages")
     
     if successful_installs < total_packages:
         print("⚠️  Some packages failed to install. Please check the errors above.")
@@ -263,8 +504,15 @@ def main():
     return 0
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Install packages for the swap analytics dashboard")
+    parser.add_argument("--wheelhouse", metavar="DIR",
+                        help="install from prebuilt wheels in DIR, building them first if needed")
+    args = parser.parse_args()
+    
     try:
-        exit_code = main()
+        exit_code = main(wheelhouse=args.wheelhouse)
         sys.exit(exit_code)
     except KeyboardInterrupt:
         print("\n\nInstallation cancelled by user.")
@@ -1,9 +1,13 @@
 import os
-import glob
 import re
 from datetime import datetime
 import threading
+import itertools
+import bisect
+import heapq
+from collections import namedtuple
 import sys
+from functools import lru_cache
 from cba.analytics import xcurves as xc
 
 # Import realtime_curves from the same directory
@@ -15,26 +19,71 @@ except ImportError as e:
     REALTIME_AVAILABLE = False
     print(f"⚠️ Real-time curves module not available: {e}")
 
-# Global curves cache - stores both historical and real-time bundle names
-curves_cache = {}
-curves_loaded = {}
-curves_lock = threading.Lock()
+# Core bundles may be stored zstd-compressed by core_curve_serializer
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Core bundles live in the core_curves directory next to this script's folder
+_CORE_CURVES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core_curves')
+
+# Core bundle filenames: YYMMDD_core_bundle.json, optionally zstd-compressed
+_BUNDLE_FNAME_RE = re.compile(r'^(\d{6})_core_bundle\.json(\.zst)?$', re.ASCII)
+
+# Bundle loading threads: at least 12, more on larger machines
+HISTORICAL_LOAD_THREADS = max(12, os.cpu_count() or 1)
+
+# Decompressed copies of .zst bundles, reused while newer than their source. This trades
+# disk back for startup time: the bundles in the load window are also kept uncompressed,
+# so only bundles outside the window stay compressed (older copies are pruned after each load)
+_BUNDLE_CACHE_DIR = os.path.join(_CORE_CURVES_DIR, '.bundle_cache')
+
+# Global curves cache - stores both historical and real-time bundle names.
+# Writers build a new snapshot and publish it with a single assignment, so readers
+# never take a lock; curves_lock only serialises writers (re-entrant, since
+# initialize_curves adds the real-time bundle while holding it)
+CacheSnapshot = namedtuple('CacheSnapshot', 'cache dates loaded')
+_current_snapshot = CacheSnapshot({}, (), False)
+curves_lock = threading.RLock()
+
+def _cache_bundles(bundles: dict):
+    """Publish a snapshot with bundles added (caller must hold curves_lock)"""
+    global _current_snapshot
+    snapshot = _current_snapshot
+    dates = list(snapshot.dates)
+    for date_str in bundles.keys() - snapshot.cache.keys():
+        bisect.insort(dates, date_str)
+    _current_snapshot = snapshot._replace(cache={**snapshot.cache, **bundles}, dates=tuple(dates))
+
+def _mark_loaded():
+    """Publish a snapshot flagged as loaded (caller must hold curves_lock)"""
+    global _current_snapshot
+    _current_snapshot = _current_snapshot._replace(loaded=True)
+
+# Global progress tracking. Each field is a one-element list written with a single
+# store, which is atomic under the GIL, so pollers never take a lock; loader workers
+# take _progress_lock so their out-of-order counts never move _progress_current back
+_progress_lock = threading.Lock()
+_progress_current = [0]
+_progress_total = [0]
+_progress_status = ['idle']
+_progress_message = ['']
 
-# Global progress tracking
-progress_data = {
-    'current': 0,
-    'total': 0,
-    'status': 'idle',
-    'message': ''
-}
-progress_lock = threading.Lock()
+def _set_status(status: str, message: str):
+    """Update the progress status and message"""
+    _progress_status[0] = status
+    _progress_message[0] = message
 
+@lru_cache(maxsize=16384)
 def yymmdd_to_datetime(date_str: str) -> datetime:
     """Convert YYMMDD to datetime object"""
-    yy, mm, dd = int(date_str[:2]), int(date_str[2:4]), int(date_str[4:6])
-    # Handle dates starting with 9 as 1990s (90-99 -> 1990-1999)
-    year = 1900 + yy if yy >= 90 else 2000 + yy
-    return datetime(year, mm, dd)
+    # One int() over the whole date, then split it arithmetically
+    yy, mmdd = divmod(int(date_str[:6]), 10000)
+    mm, dd = divmod(mmdd, 100)
+    # Handle dates starting with 9 as 1990s (90-99 -> 1990-1999); yy // 90 is 1 only for those
+    return datetime(2000 + yy - (yy // 90) * 100, mm, dd)
 
 def get_most_recent_core_bundles(max_days: int = 200):
     """
@@ -44,41 +93,35 @@ def get_most_recent_core_bundles(max_days: int = 200):
         max_days: Maximum number of days to load
     
     Returns:
-        list: List of (date_str, bundle_filename) tuples sorted by date (most recent first)
+        list: List of (date_str, bundle_filename, bundle_filepath) tuples sorted by date (most recent first)
     """
-    # Get path to core_curves directory
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    chart_app_dir = os.path.dirname(script_dir)
-    core_curves_dir = os.path.join(chart_app_dir, 'core_curves')
-    
-    if not os.path.exists(core_curves_dir):
-        print(f"❌ Core curves directory not found: {core_curves_dir}")
+    if not os.path.exists(_CORE_CURVES_DIR):
+        print(f"❌ Core curves directory not found: {_CORE_CURVES_DIR}")
         return []
     
-    # Find all core bundle files
-    bundle_files = glob.glob(os.path.join(core_curves_dir, "*_core_bundle.json"))
-    
-    if not bundle_files:
-        print(f"❌ No core bundle files found in: {core_curves_dir}")
+    # Extract dates from filenames like "001006_core_bundle.json" in a single directory pass
+    # (compressed bundles only if they can be read), keeping one file per date and
+    # preferring the plain .json if a date has both forms
+    bundles_by_date = {}
+    file_count = 0
+    with os.scandir(_CORE_CURVES_DIR) as entries:
+        for entry in entries:
+            match = _BUNDLE_FNAME_RE.match(entry.name)
+            if match and (ZSTD_AVAILABLE or not match.group(2)):
+                file_count += 1
+                date_str = match.group(1)
+                if date_str not in bundles_by_date or not match.group(2):
+                    bundles_by_date[date_str] = (date_str, entry.name, entry.path)
+    
+    if not bundles_by_date:
+        print(f"❌ No core bundle files found in: {_CORE_CURVES_DIR}")
         return []
     
-    # Extract dates and sort by date (most recent first)
-    file_dates = []
-    for filepath in bundle_files:
-        filename = os.path.basename(filepath)
-        try:
-            # Extract date from filename like "001006_core_bundle.json"
-            date_str = filename[:6]
-            date_obj = yymmdd_to_datetime(date_str)
-            file_dates.append((date_obj, date_str, filename))
-        except:
-            continue
-    
-    # Sort by date (most recent first) and take max_days
-    file_dates.sort(key=lambda x: x[0], reverse=True)
-    recent_bundles = [(date_str, filename) for _, date_str, filename in file_dates[:max_days]]
+    # Take the max_days most recent with a partial heap select rather than a full sort.
+    # YYMMDD strings sort chronologically within a century, so only the 1990s need separating
+    recent_bundles = heapq.nlargest(max_days, bundles_by_date.values(), key=lambda x: (x[0][:2] < '90', x[0]))
     
-    print(f"📅 Found {len(bundle_files)} total core bundles, selected {len(recent_bundles)} most recent")
+    print(f"📅 Found {file_count} total core bundles, selected {len(recent_bundles)} most recent")
     if recent_bundles:
         oldest_date = yymmdd_to_datetime(recent_bundles[-1][0])
         newest_date = yymmdd_to_datetime(recent_bundles[0][0])
@@ -86,7 +129,113 @@ def get_most_recent_core_bundles(max_days: int = 200):
     
     return recent_bundles
 
-def load_historical_bundles(max_days: int = 200, num_threads: int = 12):
+# Per-thread scratch buffer for _prefetch_file, reused across files
+_prefetch_local = threading.local()
+PREFETCH_CHUNK = 4 << 20
+
+def _prefetch_file(filepath: str):
+    """Read a file through once so it is in the OS page cache (file reads release the GIL)"""
+    buffer = getattr(_prefetch_local, 'buffer', None)
+    if buffer is None:
+        buffer = _prefetch_local.buffer = bytearray(PREFETCH_CHUNK)
+    
+    # readinto a reused buffer: large reads, no per-chunk allocations
+    with open(filepath, 'rb', buffering=0) as f:
+        while f.readinto(buffer):
+            pass
+
+# Bundles to keep hinted ahead of the ones being loaded
+PREFETCH_WINDOW = 8
+
+def _fadvise(filepaths, advice_name: str):
+    """
+    Pass a posix_fadvise hint for whole files (no-op where unsupported)
+    
+    Args:
+        filepaths: Files to advise on
+        advice_name: os constant name, e.g. 'POSIX_FADV_WILLNEED' to prefetch
+                     or 'POSIX_FADV_DONTNEED' to let the pages go
+    """
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, 'posix_fadvise'):
+        return
+    
+    for filepath in filepaths:
+        try:
+            fd = os.open(filepath, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+def _decompressed_bundle_path(bundle_filepath: str):
+    """
+    Get a plain JSON copy of a .zst bundle, reusing the cached copy when it is up to date
+    
+    Args:
+        bundle_filepath: Path to the compressed bundle
+    
+    Returns:
+        tuple: (json_path, is_temporary) - temporary files must be removed by the caller
+    """
+    cached_path = os.path.join(_BUNDLE_CACHE_DIR, os.path.basename(bundle_filepath)[:-len('.zst')])
+    try:
+        if os.path.getmtime(cached_path) >= os.path.getmtime(bundle_filepath):
+            return cached_path, False
+    except OSError:
+        pass
+    
+    with open(bundle_filepath, 'rb') as f:
+        data = zstandard.ZstdDecompressor().decompress(f.read())
+    
+    # Keep the decompressed copy for the next start; fall back to a temporary file if the cache isn't writable
+    try:
+        os.makedirs(_BUNDLE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, cached_path)
+        return cached_path, False
+    except OSError:
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return tmp_path, True
+
+def _prune_bundle_cache(bundle_filepaths):
+    """Remove cached decompressed bundles (and stray temporary files) not in bundle_filepaths"""
+    keep = {os.path.basename(path)[:-len('.zst')] for path in bundle_filepaths if path.endswith('.zst')}
+    try:
+        with os.scandir(_BUNDLE_CACHE_DIR) as it:
+            stale = [entry.path for entry in it if entry.name not in keep]
+    except OSError:
+        return
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def deserialise_bundle(bundle_filepath: str, bundle_name: str):
+    """Deserialise a core bundle into xcurves, decompressing .zst bundles into the bundle cache"""
+    is_temporary = False
+    if bundle_filepath.endswith('.zst'):
+        bundle_filepath, is_temporary = _decompressed_bundle_path(bundle_filepath)
+    
+    try:
+        # Do the disk I/O outside xcurves so other threads can parse while this one waits
+        _prefetch_file(bundle_filepath)
+        xc.Deserialise(bundle_filepath, bundle_name, True, True)
+    finally:
+        if is_temporary:
+            os.remove(bundle_filepath)
+
+def load_historical_bundles(max_days: int = 200, num_threads: int = HISTORICAL_LOAD_THREADS):
     """
     Load historical core bundles from core_curves directory using concurrent threads
     
@@ -104,67 +253,57 @@ def load_historical_bundles(max_days: int = 200, num_threads: int = 12):
         return {}
     
     # Initialize progress
-    with progress_lock:
-        progress_data.update({
-            'current': 0,
-            'total': len(recent_bundles),
-            'status': 'loading',
-            'message': f'Loading {len(recent_bundles)} historical bundles...'
-        })
-    
-    # Get path to core_curves directory
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    chart_app_dir = os.path.dirname(script_dir)
-    core_curves_dir = os.path.join(chart_app_dir, 'core_curves')
-    
-    loaded_bundles = {}
-    success_count = 0
-    bundle_lock = threading.Lock()
-    
-    def load_bundle_worker(bundle_info):
-        """Worker function to load a single bundle"""
-        nonlocal success_count
-        date_str, filename = bundle_info
+    _progress_current[0] = 0
+    _progress_total[0] = len(recent_bundles)
+    _progress_message[0] = None  # Formatted from current/total by get_progress
+    _progress_status[0] = 'loading'
+    
+    success_counter = itertools.count(1)  # next() is atomic, so no lock is needed
+    
+    # Workers start in order, so hint a window of files just ahead of the running ones
+    bundle_paths = [bundle_filepath for _, _, bundle_filepath in recent_bundles]
+    lookahead = num_threads + PREFETCH_WINDOW
+    
+    def load_bundle_worker(indexed_bundle):
+        """Worker function to load a single bundle, returning (date_str, bundle_name) or None"""
+        i, (date_str, _, bundle_filepath) = indexed_bundle
+        _fadvise(bundle_paths[i + lookahead:i + lookahead + 1], 'POSIX_FADV_WILLNEED')
         
         try:
-            bundle_filepath = os.path.join(core_curves_dir, filename)
-            bundle_name = f"{date_str}_core"
+            # Interned: the name is kept in the cache and passed to every xcurves pricing call
+            bundle_name = sys.intern(f"{date_str}_core")
             
-            # Deserialize the bundle directly into xcurves
-            xc.Deserialise(bundle_filepath, bundle_name, True, True)
+            # Deserialize the bundle directly into xcurves, then drop its pages from the cache
+            deserialise_bundle(bundle_filepath, bundle_name)
+            _fadvise([bundle_filepath], 'POSIX_FADV_DONTNEED')
             
-            # Thread-safe update of results
-            with bundle_lock:
-                loaded_bundles[date_str] = bundle_name
-                success_count += 1
-                current_count = success_count
+            current_count = next(success_counter)
+            if current_count % 50 == 0:
+                print(f"📦 Loaded {current_count}/{len(recent_bundles)} historical bundles")
             
-            # Update progress (thread-safe)
-            with progress_lock:
-                progress_data.update({
-                    'current': current_count,
-                    'message': f'Loading historical bundles: {current_count}/{len(recent_bundles)}'
-                })
+            # Update progress; counts can arrive slightly out of order
+            with _progress_lock:
+                if current_count > _progress_current[0]:
+                    _progress_current[0] = current_count
+            
+            return date_str, bundle_name
                 
         except Exception as e:
-            pass  # Silent failure for individual bundles
+            return None  # Silent failure for individual bundles
     
     # Use ThreadPoolExecutor for concurrent loading
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from concurrent.futures import ThreadPoolExecutor
     
+    _fadvise(bundle_paths[:lookahead], 'POSIX_FADV_WILLNEED')
     with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        # Submit all bundle loading tasks
-        future_to_bundle = {
-            executor.submit(load_bundle_worker, bundle_info): bundle_info 
-            for bundle_info in recent_bundles
-        }
-        
-        # Wait for all tasks to complete
-        for future in as_completed(future_to_bundle):
-            try:
-                future.result()
-            except Exception:
-                pass  # Silent failure
+        loaded_bundles = dict(result for result in executor.map(load_bundle_worker, enumerate(recent_bundles))
+                              if result is not None)
+    
+    # Drop cached copies of bundles that have aged out of the load window
+    _prune_bundle_cache(bundle_paths)
+    
+    # Failed bundles never advance the counter, so record the final loaded count
+    _progress_current[0] = len(loaded_bundles)
     
     return loaded_bundles
 
@@ -188,22 +327,14 @@ def add_realtime_bundle(currencies: list = None):
     today_yymmdd = datetime.now().strftime("%y%m%d")
     
     # Update progress to show real-time building
-    with progress_lock:
-        progress_data.update({
-            'status': 'loading',
-            'message': f'Building real-time bundle...'
-        })
+    _set_status('loading', 'Building real-time bundle...')
     
     try:
         # Build real-time curves using the existing realtime_curves module
         realtime_result = realtime_curves.build_selected_curves_realtime(today, currencies)
         
         if 'error' in realtime_result:
-            with progress_lock:
-                progress_data.update({
-                    'status': 'error',
-                    'message': f'Real-time bundle failed'
-                })
+            _set_status('error', 'Real-time bundle failed')
             return {'error': realtime_result['error']}
         
         # The real-time system automatically creates a bundle named {today_yymmdd}_core_bundle
@@ -211,14 +342,10 @@ def add_realtime_bundle(currencies: list = None):
         
         # Add to our cache
         with curves_lock:
-            curves_cache[today_yymmdd] = bundle_name
+            _cache_bundles({today_yymmdd: bundle_name})
         
         # Update progress to show real-time bundle completed
-        with progress_lock:
-            progress_data.update({
-                'status': 'complete',
-                'message': f'Real-time bundle loaded'
-            })
+        _set_status('complete', 'Real-time bundle loaded')
         
         # Show only the currencies included in today's bundle
         currencies_upper = [ccy.upper() for ccy in currencies]
@@ -232,11 +359,7 @@ def add_realtime_bundle(currencies: list = None):
         }
         
     except Exception as e:
-        with progress_lock:
-            progress_data.update({
-                'status': 'error',
-                'message': f'Failed to build real-time bundle'
-            })
+        _set_status('error', 'Failed to build real-time bundle')
         return {'error': f'Failed to build real-time bundle: {str(e)}'}
 
 def initialize_curves(max_days: int = 200, include_realtime: bool = True, realtime_currencies: list = None):
@@ -251,8 +374,6 @@ def initialize_curves(max_days: int = 200, include_realtime: bool = True, realti
     Returns:
         dict: Dictionary of loaded bundle names with status
     """
-    global curves_cache, curves_loaded
-    
     results = {
         'historical': {},
         'realtime': {},
@@ -262,19 +383,15 @@ def initialize_curves(max_days: int = 200, include_realtime: bool = True, realti
     
     with curves_lock:
         # Step 1: Load historical bundles
-        historical_bundles = load_historical_bundles(max_days, num_threads=12)
-        curves_cache.update(historical_bundles)
+        historical_bundles = load_historical_bundles(max_days)
+        _cache_bundles(historical_bundles)
         results['historical'] = historical_bundles
         
         # Mark as loaded and complete after historical bundles are done
-        curves_loaded['bundles'] = True
+        _mark_loaded()
         
         # Mark as complete immediately after historical loading
-        with progress_lock:
-            progress_data.update({
-                'status': 'complete',
-                'message': f'Historical curves loaded'
-            })
+        _set_status('complete', 'Historical curves loaded')
         
         # Step 2: Add real-time bundle if requested
         if include_realtime:
@@ -297,8 +414,6 @@ def initialize_historical_curves_only(max_days: int = 200):
     Returns:
         dict: Dictionary of loaded bundle names with status
     """
-    global curves_cache, curves_loaded
-    
     results = {
         'historical': {},
         'status': 'success',
@@ -307,19 +422,15 @@ def initialize_historical_curves_only(max_days: int = 200):
     
     with curves_lock:
         # Load historical bundles only
-        historical_bundles = load_historical_bundles(max_days, num_threads=12)
-        curves_cache.update(historical_bundles)
+        historical_bundles = load_historical_bundles(max_days)
+        _cache_bundles(historical_bundles)
         results['historical'] = historical_bundles
         
         # Mark as loaded and complete after historical bundles are done
-        curves_loaded['bundles'] = True
+        _mark_loaded()
         
         # Mark as complete immediately after historical loading
-        with progress_lock:
-            progress_data.update({
-                'status': 'complete',
-                'message': f'Historical curves loaded'
-            })
+        _set_status('complete', 'Historical curves loaded')
     
     return results
 
@@ -333,57 +444,57 @@ def get_bundle_name(date_str: str):
     Returns:
         str: Bundle name or None if not found
     """
-    with curves_lock:
-        return curves_cache.get(date_str)
+    return _current_snapshot.cache.get(date_str)
+
+def get_cache_snapshot():
+    """Get the current cache snapshot; a new object is published on every change"""
+    return _current_snapshot
 
 def get_available_dates():
     """Get list of available dates in the cache (both historical and real-time)"""
-    with curves_lock:
-        return sorted(curves_cache.keys())
+    return list(_current_snapshot.dates)
 
 def is_curves_loaded():
     """Check if curves are loaded"""
-    with curves_lock:
-        return curves_loaded.get('bundles', False)
+    return _current_snapshot.loaded
 
 def clear_curves():
     """Clear curves cache"""
-    global curves_cache, curves_loaded
+    global _current_snapshot
     with curves_lock:
-        curves_cache.clear()
-        curves_loaded.clear()
+        _current_snapshot = CacheSnapshot({}, (), False)
     print("🧹 Curves cache cleared")
 
 def get_cache_stats():
     """Get statistics about the cache"""
-    with curves_lock:
-        if not curves_cache:
-            return {
-                'loaded': False,
-                'bundle_count': 0,
-                'date_range': None,
-                'has_today': False
-            }
-        
-        dates = sorted(curves_cache.keys())
-        oldest_date = yymmdd_to_datetime(dates[-1]) if dates else None
-        newest_date = yymmdd_to_datetime(dates[0]) if dates else None
-        
-        # Check if today's data is included
-        today_yymmdd = datetime.now().strftime("%y%m%d")
-        has_today = today_yymmdd in curves_cache
-        
+    snapshot = _current_snapshot
+    if not snapshot.cache:
         return {
-            'loaded': True,
-            'bundle_count': len(curves_cache),
-            'date_range': {
-                'oldest': oldest_date.strftime('%Y-%m-%d') if oldest_date else None,
-                'newest': newest_date.strftime('%Y-%m-%d') if newest_date else None
-            },
-            'has_today': has_today,
-            'today_date': datetime.now().strftime('%Y-%m-%d'),
-            'sample_dates': dates[:10]  # First 10 dates as sample
+            'loaded': False,
+            'bundle_count': 0,
+            'date_range': None,
+            'has_today': False
         }
+    
+    dates = snapshot.dates
+    oldest_date = yymmdd_to_datetime(dates[-1]) if dates else None
+    newest_date = yymmdd_to_datetime(dates[0]) if dates else None
+    
+    # Check if today's data is included
+    today_yymmdd = datetime.now().strftime("%y%m%d")
+    has_today = today_yymmdd in snapshot.cache
+    
+    return {
+        'loaded': True,
+        'bundle_count': len(snapshot.cache),
+        'date_range': {
+            'oldest': oldest_date.strftime('%Y-%m-%d') if oldest_date else None,
+            'newest': newest_date.strftime('%Y-%m-%d') if newest_date else None
+        },
+        'has_today': has_today,
+        'today_date': datetime.now().strftime('%Y-%m-%d'),
+        'sample_dates': list(dates[:10])  # First 10 dates as sample
+    }
 
 def update_realtime_bundle(currencies: list = None):
     """
@@ -410,16 +521,25 @@ def update_realtime_bundle(currencies: list = None):
 
 def get_progress():
     """Get current progress of loading"""
-    with progress_lock:
-        return progress_data.copy()
+    progress = {
+        'current': _progress_current[0],
+        'total': _progress_total[0],
+        'status': _progress_status[0],
+        'message': _progress_message[0]
+    }
+    
+    # Historical loading leaves the message unset so workers only have to bump the count
+    if progress['message'] is None:
+        if progress['current']:
+            progress['message'] = f"Loading historical bundles: {progress['current']}/{progress['total']}"
+        else:
+            progress['message'] = f"Loading {progress['total']} historical bundles..."
+    
+    return progress
 
 def reset_progress():
     """Reset progress tracking"""
-    global progress_data
-    with progress_lock:
-        progress_data = {
-            'current': 0,
-            'total': 0,
-            'status': 'idle',
-            'message': ''
-        }
+    _progress_current[0] = 0
+    _progress_total[0] = 0
+    _progress_status[0] = 'idle'
+    _progress_message[0] = ''
@@ -12,39 +12,150 @@ This module implements various performance improvements including:
 import os
 import json
 import pickle
+import pickletools
 import hashlib
 import threading
 import time
+import random
 from datetime import datetime, timedelta
 from functools import lru_cache, wraps
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 
+# diskcache stores disk cache entries in sharded SQLite with built-in expiry and
+# eviction; without it entries fall back to one pickle file per key
+try:
+    from diskcache import FanoutCache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
 # Global cache configurations
 CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache')
 MEMORY_CACHE = {}
 CACHE_LOCK = threading.Lock()
 MAX_MEMORY_CACHE_SIZE = 100  # Maximum number of items in memory cache
+LRU_EVICTION_SAMPLES = 5  # Entries compared when memory_cache_with_lru evicts
+DISK_CACHE_SHARDS = 8
+DISK_CACHE_SIZE_LIMIT = 2 ** 30  # Bytes; least recently used entries are evicted beyond this
+DISK_CACHE_LOW_WATERMARK = 0.8  # Pickle-file cache is swept down to this fraction of the limit
+
+# Shared diskcache store, created on first use
+_DISK_CACHE = None
+_DISK_CACHE_LOCK = threading.Lock()
+_MISSING = object()
 
-# Performance monitoring
+# Approximate size in bytes of the pickle-file cache, scanned on the first write
+_pickle_cache_bytes = [None]
+
+# Performance monitoring. Each counter is split into STATS_STRIPES slots and a thread
+# only bumps the slot for its own thread id, under that slot's lock, so threads contend
+# only when their ids share a stripe; readers sum the slots
+STATS_STRIPES = 16
+_STATS_LOCKS = [threading.Lock() for _ in range(STATS_STRIPES)]
 PERFORMANCE_STATS = {
-    'cache_hits': 0,
-    'cache_misses': 0,
-    'avg_load_time': 0,
-    'total_requests': 0
+    'cache_hits': [0] * STATS_STRIPES,
+    'cache_misses': [0] * STATS_STRIPES,
+    'total_time': [0.0] * STATS_STRIPES,
+    'total_requests': [0] * STATS_STRIPES
 }
-STATS_LOCK = threading.Lock()
+
+def _record_stat(name: str, amount=1):
+    """Add to a performance counter in the calling thread's slot"""
+    stripe = threading.get_native_id() % STATS_STRIPES
+    with _STATS_LOCKS[stripe]:
+        PERFORMANCE_STATS[name][stripe] += amount
+
+def _stat_total(name: str):
+    """Current value of a performance counter, summed over all slots"""
+    return sum(PERFORMANCE_STATS[name])
 
 def ensure_cache_dir():
     """Ensure cache directory exists"""
     if not os.path.exists(CACHE_DIR):
         os.makedirs(CACHE_DIR)
 
+def _get_disk_cache():
+    """Get the shared diskcache store, creating it on first use"""
+    global _DISK_CACHE
+    if _DISK_CACHE is None:
+        with _DISK_CACHE_LOCK:
+            if _DISK_CACHE is None:
+                _DISK_CACHE = FanoutCache(
+                    CACHE_DIR,
+                    shards=DISK_CACHE_SHARDS,
+                    size_limit=DISK_CACHE_SIZE_LIMIT,
+                    eviction_policy='least-recently-used',
+                    disk_pickle_protocol=pickle.HIGHEST_PROTOCOL
+                )
+    return _DISK_CACHE
+
+def _pickle_cache_files() -> list:
+    """List the pickle-file cache as (mtime, size, path), oldest first"""
+    files = []
+    with os.scandir(CACHE_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith('.pkl'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+    return files
+
+def _record_pickle_cache_write(nbytes: int):
+    """
+    Account for a new pickle-file cache entry; once the cache exceeds DISK_CACHE_SIZE_LIMIT,
+    delete the oldest entries until it is back under the low watermark
+    """
+    with _DISK_CACHE_LOCK:
+        if _pickle_cache_bytes[0] is None:
+            _pickle_cache_bytes[0] = sum(size for _, size, _ in _pickle_cache_files())
+        else:
+            _pickle_cache_bytes[0] += nbytes
+        
+        if _pickle_cache_bytes[0] <= DISK_CACHE_SIZE_LIMIT:
+            return
+        
+        # Rescan for exact sizes (overwritten keys are counted twice above)
+        files = _pickle_cache_files()
+        total_bytes = sum(size for _, size, _ in files)
+        target_bytes = DISK_CACHE_SIZE_LIMIT * DISK_CACHE_LOW_WATERMARK
+        for _, size, path in files:
+            if total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except OSError:
+                pass
+        _pickle_cache_bytes[0] = total_bytes
+
 def get_cache_key(func_name: str, *args, **kwargs) -> str:
     """Generate a unique cache key for function calls"""
     key_data = f"{func_name}:{str(args)}:{str(sorted(kwargs.items()))}"
-    return hashlib.md5(key_data.encode()).hexdigest()
+    return hashlib.blake2b(key_data.encode(), digest_size=16).hexdigest()
+
+def _memory_cache_key(func_name: str, args: tuple, kwargs: dict):
+    """
+    Key for an in-process cache: the arguments themselves when they are hashable,
+    skipping the string conversion and digest; otherwise the get_cache_key digest.
+    Argument types are part of the key so f(1), f(1.0) and f(True) stay distinct
+    """
+    kwargs_items = tuple(sorted(kwargs.items()))
+    key = (
+        args,
+        kwargs_items,
+        tuple(type(arg) for arg in args),
+        tuple(type(value) for _, value in kwargs_items),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return get_cache_key(func_name, *args, **kwargs)
+    return key
 
 def disk_cache(expiry_hours: int = 24):
     """
@@ -53,10 +164,13 @@ def disk_cache(expiry_hours: int = 24):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            ensure_cache_dir()
-            
             # Generate cache key
             cache_key = get_cache_key(func.__name__, *args, **kwargs)
+            
+            if DISKCACHE_AVAILABLE:
+                return _diskcache_call(func, cache_key, expiry_hours, args, kwargs)
+            
+            ensure_cache_dir()
             cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
             
             # Check if cache exists and is not expired
@@ -65,10 +179,9 @@ def disk_cache(expiry_hours: int = 24):
                 if file_age < expiry_hours * 3600:  # Convert hours to seconds
                     try:
                         with open(cache_file, 'rb') as f:
-                            result = pickle.load(f)
+                            result = pickle.loads(f.read())
                         
-                        with STATS_LOCK:
-                            PERFORMANCE_STATS['cache_hits'] += 1
+                        _record_stat('cache_hits')
                         
                         return result
                     except:
@@ -76,23 +189,16 @@ def disk_cache(expiry_hours: int = 24):
                         os.remove(cache_file)
             
             # Cache miss - execute function
-            with STATS_LOCK:
-                PERFORMANCE_STATS['cache_misses'] += 1
-            
-            start_time = time.time()
-            result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
+            _record_stat('cache_misses')
             
-            # Update performance stats
-            with STATS_LOCK:
-                PERFORMANCE_STATS['total_requests'] += 1
-                total_time = PERFORMANCE_STATS['avg_load_time'] * (PERFORMANCE_STATS['total_requests'] - 1)
-                PERFORMANCE_STATS['avg_load_time'] = (total_time + execution_time) / PERFORMANCE_STATS['total_requests']
+            result = _timed_call(func, args, kwargs)
             
-            # Save to cache
+            # Save to cache at the highest protocol, with redundant PUT opcodes stripped
             try:
+                payload = pickletools.optimize(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
                 with open(cache_file, 'wb') as f:
-                    pickle.dump(result, f)
+                    f.write(payload)
+                _record_pickle_cache_write(len(payload))
             except Exception as e:
                 print(f"Warning: Could not save to cache: {e}")
             
@@ -100,62 +206,113 @@ def disk_cache(expiry_hours: int = 24):
         return wrapper
     return decorator
 
+def _timed_call(func, args, kwargs):
+    """Call func on a cache miss, folding its run time into the performance stats"""
+    start_time = time.time()
+    result = func(*args, **kwargs)
+    execution_time = time.time() - start_time
+    
+    # Update performance stats
+    _record_stat('total_requests')
+    _record_stat('total_time', execution_time)
+    
+    return result
+
+def _diskcache_call(func, cache_key: str, expiry_hours: int, args, kwargs):
+    """disk_cache lookup through diskcache: one indexed fetch, with expiry and eviction handled by the store"""
+    store = _get_disk_cache()
+    result = store.get(cache_key, default=_MISSING, retry=True)
+    if result is not _MISSING:
+        _record_stat('cache_hits')
+        return result
+    
+    # Cache miss - execute function
+    _record_stat('cache_misses')
+    
+    result = _timed_call(func, args, kwargs)
+    
+    try:
+        store.set(cache_key, result, expire=expiry_hours * 3600, tag=func.__name__, retry=True)
+    except Exception as e:
+        print(f"Warning: Could not save to cache: {e}")
+    
+    return result
+
 def memory_cache_with_lru(maxsize: int = 128):
     """
-    Enhanced memory cache with LRU eviction and size limits
+    Enhanced memory cache with approximate LRU eviction and size limits
+    Hits take no lock: they only stamp the entry's last access time. Inserts take the
+    lock and, when over the limit, evict the least recently used of
+    LRU_EVICTION_SAMPLES randomly sampled entries
     """
     def decorator(func):
+        # cache_key -> [last_access, result]; cache_keys lists the same keys so eviction
+        # can sample by index without copying the dict
         cache = {}
-        access_order = []
+        cache_keys = []
         cache_lock = threading.Lock()
         
         @wraps(func)
         def wrapper(*args, **kwargs):
-            cache_key = get_cache_key(func.__name__, *args, **kwargs)
+            cache_key = _memory_cache_key(func.__name__, args, kwargs)
             
-            with cache_lock:
-                # Check if in cache
-                if cache_key in cache:
-                    # Move to end (most recently used)
-                    access_order.remove(cache_key)
-                    access_order.append(cache_key)
-                    
-                    with STATS_LOCK:
-                        PERFORMANCE_STATS['cache_hits'] += 1
-                    
-                    return cache[cache_key]
+            # Check if in cache
+            entry = cache.get(cache_key)
+            if entry is not None:
+                # Mark as most recently used
+                entry[0] = time.monotonic()
+                
+                _record_stat('cache_hits')
                 
-                # Cache miss
-                with STATS_LOCK:
-                    PERFORMANCE_STATS['cache_misses'] += 1
+                return entry[1]
+            
+            # Cache miss
+            _record_stat('cache_misses')
             
             # Execute function
             result = func(*args, **kwargs)
             
             with cache_lock:
-                # Add to cache
-                cache[cache_key] = result
-                access_order.append(cache_key)
+                # Add to cache (another thread may have stored the same key meanwhile)
+                if cache_key not in cache:
+                    cache_keys.append(cache_key)
+                cache[cache_key] = [time.monotonic(), result]
                 
                 # Evict if over size limit
                 while len(cache) > maxsize:
-                    oldest_key = access_order.pop(0)
-                    del cache[oldest_key]
+                    sample = random.sample(range(len(cache_keys)), min(LRU_EVICTION_SAMPLES, len(cache_keys)))
+                    victim = min(sample, key=lambda index: cache[cache_keys[index]][0])
+                    del cache[cache_keys[victim]]
+                    # Swap-remove so the key list stays dense
+                    cache_keys[victim] = cache_keys[-1]
+                    cache_keys.pop()
             
             return result
         
         # Add cache management methods
         wrapper.cache_info = lambda: {
-            'hits': PERFORMANCE_STATS['cache_hits'],
-            'misses': PERFORMANCE_STATS['cache_misses'],
+            'hits': _stat_total('cache_hits'),
+            'misses': _stat_total('cache_misses'),
             'size': len(cache),
             'maxsize': maxsize
         }
-        wrapper.cache_clear = lambda: cache.clear() or access_order.clear()
+        def cache_clear():
+            with cache_lock:
+                cache.clear()
+                cache_keys.clear()
+        
+        wrapper.cache_clear = cache_clear
         
         return wrapper
     return decorator
 
+@lru_cache(maxsize=4096)
+def _yymmdd_cached(date_str: str) -> datetime:
+    """Convert YYMMDD to datetime (90-99 -> 1990s), memoised since curve dates repeat across scans"""
+    yy, mm, dd = int(date_str[:2]), int(date_str[2:4]), int(date_str[4:6])
+    year = 1900 + yy if yy >= 90 else 2000 + yy
+    return datetime(year, mm, dd)
+
 class DataPreprocessor:
     """
     Preprocesses and indexes curve data for faster access
@@ -170,42 +327,51 @@ class DataPreprocessor:
     def preprocess_curve_files(self, currency: str, folder_path: str) -> Dict[str, Any]:
         """
         Preprocess curve files to create optimized data structures
+        File metadata is held as parallel arrays sorted by date ('dates' as datetime64[D],
+        'date_strs', 'names' and 'paths')
         """
-        curve_files = [f for f in os.listdir(folder_path) if f.endswith('.json')]
+        # Collect the dated files in a single directory pass
+        date_objs = []
+        date_strs = []
+        names = []
+        paths = []
+        total_files = 0
         
-        # Sort files by date for better cache locality
-        curve_files.sort()
-        
-        # Create date index
-        date_index = {}
-        file_metadata = {}
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                filename = entry.name
+                if not filename.endswith('.json'):
+                    continue
+                total_files += 1
+                
+                try:
+                    date_str = filename[:6]
+                    date_obj = self._yymmdd_to_datetime(date_str)
+                except ValueError:
+                    continue
+                
+                date_objs.append(date_obj)
+                date_strs.append(date_str)
+                names.append(filename)
+                paths.append(entry.path)
         
-        for filename in curve_files:
-            try:
-                date_str = filename[:6]
-                date_obj = self._yymmdd_to_datetime(date_str)
-                date_index[date_obj] = filename
-                file_metadata[filename] = {
-                    'date': date_obj,
-                    'date_str': date_str,
-                    'path': os.path.join(folder_path, filename)
-                }
-            except:
-                continue
+        # Sort every column by date once, so the range is just the first and last entries
+        dates = np.array(date_objs, dtype='datetime64[D]')
+        order = np.argsort(dates, kind='stable')
         
         return {
-            'date_index': date_index,
-            'file_metadata': file_metadata,
-            'date_range': (min(date_index.keys()), max(date_index.keys())) if date_index else None,
-            'total_files': len(curve_files)
+            'dates': dates[order],
+            'date_strs': np.array(date_strs, dtype=object)[order],
+            'names': np.array(names, dtype=object)[order],
+            'paths': np.array(paths, dtype=object)[order],
+            'date_range': (date_objs[order[0]], date_objs[order[-1]]) if date_objs else None,
+            'total_files': total_files
         }
     
     def _yymmdd_to_datetime(self, date_str: str) -> datetime:
         """Convert YYMMDD to datetime object"""
         try:
-            yy, mm, dd = int(date_str[:2]), int(date_str[2:4]), int(date_str[4:6])
-            year = 1900 + yy if yy >= 90 else 2000 + yy
-            return datetime(year, mm, dd)
+            return _yymmdd_cached(date_str)
         except ValueError as e:
             # If we can't parse the date, it might be a full path - extract just the filename
             if '\\' in date_str or '/' in date_str:
@@ -225,46 +391,45 @@ class ChartDataOptimizer:
     def optimize_dataframe_operations(df: pd.DataFrame, operations: List[str]) -> pd.DataFrame:
         """
         Optimize common dataframe operations with caching
+        Each requested operation already returns a new frame, so there is no up-front copy;
+        duplicates are dropped first so the sort and fill run on the smaller frame (a stable
+        sort keeps the same rows as sorting first)
         """
-        result_df = df.copy()
+        operations = frozenset(operations)
+        result_df = df
         
-        for operation in operations:
-            if operation == 'sort_by_date':
-                result_df = result_df.sort_values('Date')
-            elif operation == 'remove_duplicates':
-                result_df = result_df.drop_duplicates(subset=['Date'])
-            elif operation == 'fill_missing':
-                result_df = result_df.fillna(method='forward')
+        if 'remove_duplicates' in operations:
+            result_df = result_df.drop_duplicates(subset=['Date'])
+        if 'sort_by_date' in operations:
+            result_df = result_df.sort_values('Date', kind='stable')
+        if 'fill_missing' in operations:
+            result_df = result_df.ffill()
         
-        return result_df
+        return result_df.copy() if result_df is df else result_df
     
     @staticmethod
     def batch_process_expressions(expressions: List[Dict], batch_size: int = 2) -> List[Dict]:
         """
-        Process expressions in batches to reduce memory usage
+        Process expressions concurrently, at most batch_size at a time to bound memory usage
+        Expressions are priced against the curves loaded in this process, so they run on
+        threads rather than worker processes; results keep the input order
         """
-        results = []
+        from concurrent.futures import ThreadPoolExecutor
         
-        for i in range(0, len(expressions), batch_size):
-            batch = expressions[i:i + batch_size]
-            batch_results = []
-            
-            for expr in batch:
-                # Process each expression
-                try:
-                    # This would call the actual expression processing logic
-                    result = ChartDataOptimizer._process_single_expression(expr)
-                    batch_results.append(result)
-                except Exception as e:
-                    print(f"Error processing expression {expr}: {e}")
-                    batch_results.append({'error': str(e)})
-            
-            results.extend(batch_results)
-            
-            # Small delay between batches to prevent overwhelming the system
-            time.sleep(0.01)
+        def process(expr):
+            # Process each expression
+            try:
+                # This would call the actual expression processing logic
+                return ChartDataOptimizer._process_single_expression(expr)
+            except Exception as e:
+                print(f"Error processing expression {expr}: {e}")
+                return {'error': str(e)}
+        
+        if len(expressions) <= 1 or batch_size <= 1:
+            return [process(expr) for expr in expressions]
         
-        return results
+        with ThreadPoolExecutor(max_workers=min(batch_size, len(expressions))) as executor:
+            return list(executor.map(process, expressions))
     
     @staticmethod
     def _process_single_expression(expr: Dict) -> Dict:
@@ -280,31 +445,31 @@ class PerformanceMonitor:
     @staticmethod
     def get_performance_stats() -> Dict[str, Any]:
         """Get current performance statistics"""
-        with STATS_LOCK:
-            cache_hit_rate = 0
-            if PERFORMANCE_STATS['cache_hits'] + PERFORMANCE_STATS['cache_misses'] > 0:
-                cache_hit_rate = PERFORMANCE_STATS['cache_hits'] / (
-                    PERFORMANCE_STATS['cache_hits'] + PERFORMANCE_STATS['cache_misses']
-                ) * 100
-            
-            return {
-                'cache_hit_rate': f"{cache_hit_rate:.1f}%",
-                'total_requests': PERFORMANCE_STATS['total_requests'],
-                'avg_load_time': f"{PERFORMANCE_STATS['avg_load_time']:.3f}s",
-                'cache_hits': PERFORMANCE_STATS['cache_hits'],
-                'cache_misses': PERFORMANCE_STATS['cache_misses']
-            }
+        cache_hits = _stat_total('cache_hits')
+        cache_misses = _stat_total('cache_misses')
+        total_requests = _stat_total('total_requests')
+        
+        cache_hit_rate = 0
+        if cache_hits + cache_misses > 0:
+            cache_hit_rate = cache_hits / (cache_hits + cache_misses) * 100
+        
+        avg_load_time = _stat_total('total_time') / total_requests if total_requests else 0
+        
+        return {
+            'cache_hit_rate': f"{cache_hit_rate:.1f}%",
+            'total_requests': total_requests,
+            'avg_load_time': f"{avg_load_time:.3f}s",
+            'cache_hits': cache_hits,
+            'cache_misses': cache_misses
+        }
     
     @staticmethod
     def reset_stats():
         """Reset performance statistics"""
-        with STATS_LOCK:
-            PERFORMANCE_STATS.update({
-                'cache_hits': 0,
-                'cache_misses': 0,
-                'avg_load_time': 0,
-                'total_requests': 0
-            })
+        for stripe, lock in enumerate(_STATS_LOCKS):
+            with lock:
+                for slots in PERFORMANCE_STATS.values():
+                    slots[stripe] = 0
 
 def clear_all_caches():
     """Clear all caches (memory and disk)"""
@@ -314,6 +479,8 @@ def clear_all_caches():
         MEMORY_CACHE.clear()
     
     # Clear disk cache
+    if DISKCACHE_AVAILABLE:
+        _get_disk_cache().clear(retry=True)
     if os.path.exists(CACHE_DIR):
         for filename in os.listdir(CACHE_DIR):
             if filename.endswith('.pkl'):
@@ -321,6 +488,7 @@ def clear_all_caches():
                     os.remove(os.path.join(CACHE_DIR, filename))
                 except:
                     pass
+    _pickle_cache_bytes[0] = None
 
 # Utility functions for integration
 def get_cache_size() -> Dict[str, int]:
@@ -328,7 +496,9 @@ def get_cache_size() -> Dict[str, int]:
     memory_size = len(MEMORY_CACHE)
     
     disk_size = 0
-    if os.path.exists(CACHE_DIR):
+    if DISKCACHE_AVAILABLE:
+        disk_size = len(_get_disk_cache())
+    elif os.path.exists(CACHE_DIR):
         disk_size = len([f for f in os.listdir(CACHE_DIR) if f.endswith('.pkl')])
     
     return {
@@ -337,7 +507,17 @@ def get_cache_size() -> Dict[str, int]:
     }
 
 def optimize_pandas_settings():
-    """Optimize pandas settings for better performance"""
-    pd.set_option('mode.chained_assignment', None)  # Disable warning for better performance
-    pd.set_option('compute.use_bottleneck', True)   # Use bottleneck for faster operations
-    pd.set_option('compute.use_numexpr', True)      # Use numexpr for faster operations
+    """
+    Optimize pandas settings for better performance (applied once at import)
+    Copy-on-Write lets chained DataFrame operations share buffers until one is modified.
+    It is always on from pandas 3.0 (where the option is deprecated) and opt-in before
+    that; bottleneck and numexpr are already used by default when installed
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        try:
+            pd.set_option('mode.copy_on_write', True)
+        except KeyError:
+            # pandas < 1.5 has no Copy-on-Write mode
+            pass
+
+optimize_pandas_settings()
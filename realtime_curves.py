@@ -16,6 +16,7 @@ if printing_scripts_path not in sys.path:
     sys.path.append(printing_scripts_path)
 
 import printing_scripts.date_fn as date_fn
+from core_curve_serializer import FX_PAIR_RATES
 
 
 def get_all_securities_for_currencies(currencies):
@@ -935,14 +936,9 @@ def build_selected_curves_realtime(date, currencies=["aud", "eur"]):
         bundle_name = f"{today_yymmdd}_core_bundle"
         try:
             # Build currency-curve pairs: [[ccy1, curve1], [ccy2, curve2], ...]
-            currency_curve_pairs = []
-            for i in range(len(currency_list)):
-                currency_curve_pairs.append([currency_list[i], curve_names[i]])
+            currency_curve_pairs = [[ccy, curve_name] for ccy, curve_name in zip(currency_list, curve_names)]
             
-            # Build FX pairs: [["AUDUSD", "1"], ["EURUSD", "1"], ...]
-            fx_pair_rates = [["AUDUSD", "1"], ["EURUSD", "1"], ["USDJPY", "1"], ["USDCAD", "1"], ["NZDUSD", "1"], ["GBPUSD", "1"]]
-            
-            xc.BuildBlockBundle(bundle_name, currency_curve_pairs, fx_pair_rates)
+            xc.BuildBlockBundle(bundle_name, currency_curve_pairs, FX_PAIR_RATES)
             
             # Add bundle info to return data
             bundles['core'] = {
@@ -1,7 +1,7 @@
 import os
-import glob
+import sys
 from datetime import datetime, timedelta
-from core_curve_serializer import build_core_bundles, yymmdd_to_datetime, datetime_to_yymmdd, CURRENCY_CONFIG
+from core_curve_serializer import build_core_bundles, yymmdd_to_datetime, datetime_to_yymmdd, CURRENCY_CONFIG, CORE_BUNDLE_SUFFIXES, yymmdd_sort_key
 
 def get_most_recent_core_bundle_date():
     """Find the most recent core bundle date"""
@@ -12,8 +12,9 @@ def get_most_recent_core_bundle_date():
         print(f"❌ Core curves directory not found: {core_curves_dir}")
         return None
     
-    # Find all core bundle files
-    bundle_files = glob.glob(os.path.join(core_curves_dir, "*_core_bundle.json"))
+    # Find all core bundle files (one directory pass for both suffixes)
+    with os.scandir(core_curves_dir) as entries:
+        bundle_files = [entry.path for entry in entries if entry.name.endswith(CORE_BUNDLE_SUFFIXES)]
     
     if not bundle_files:
         print(f"❌ No core bundle files found")
@@ -22,20 +23,16 @@ def get_most_recent_core_bundle_date():
     # Extract dates and find the most recent
     bundle_dates = []
     for filepath in bundle_files:
-        filename = os.path.basename(filepath)
-        try:
-            date_str = filename[:6]  # Extract YYMMDD
-            date_obj = yymmdd_to_datetime(date_str)
-            bundle_dates.append((date_obj, date_str))
-        except:
-            continue
+        date_str = os.path.basename(filepath)[:6]  # Extract YYMMDD
+        if len(date_str) == 6 and date_str.isdigit():
+            bundle_dates.append(date_str)
     
     if not bundle_dates:
         return None
     
-    # Sort by date (most recent first)
-    bundle_dates.sort(key=lambda x: x[0], reverse=True)
-    most_recent_date_obj, most_recent_date_str = bundle_dates[0]
+    # Most recent by sort key; only the winner is converted to a datetime
+    most_recent_date_str = max(bundle_dates, key=yymmdd_sort_key)
+    most_recent_date_obj = yymmdd_to_datetime(most_recent_date_str)
     
     print(f"📅 Most recent core bundle: {most_recent_date_str} ({most_recent_date_obj.strftime('%Y-%m-%d')})")
     return most_recent_date_str
@@ -109,12 +106,9 @@ def load_curves_for_build_core_bundles(curves, dates, currencies):
     from cba.analytics import xcurves as xc
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
+    # Flat {(currency, date): curve_name} mapping
     loaded_curves = {}
     
-    # Initialize loaded_curves dictionary
-    for currency in currencies:
-        loaded_curves[currency] = {}
-    
     print(f"📂 Loading curves into memory...")
     
     total_loaded = 0
@@ -135,7 +129,7 @@ def load_curves_for_build_core_bundles(curves, dates, currencies):
                     xc.Deserialise(filepath, curve_name, True, True)
                     
                     # Store the curve name (not filename) for build_core_bundles
-                    loaded_curves[currency][date_str] = curve_name
+                    loaded_curves[(currency, date_str)] = curve_name
                     
                     print(f"  ✅ Loaded {currency.upper()}: {filename}")
                     total_loaded += 1
@@ -146,7 +140,13 @@ def load_curves_for_build_core_bundles(curves, dates, currencies):
     print(f"📊 Total curves loaded: {total_loaded}")
     return loaded_curves
 
-def main():
+def main(interactive: bool = False):
+    """
+    Build core bundles for every date since the most recent one
+    
+    Args:
+        interactive: Ask for confirmation before building (only when attached to a terminal)
+    """
     print("=" * 70)
     print("🎯 SIMPLE CORE CURVE SERIALIZER")
     print("=" * 70)
@@ -172,11 +172,12 @@ def main():
     print(f"\n🎯 Will build core bundles for {len(valid_dates)} dates")
     print(f"📋 Currencies: {', '.join(currencies).upper()}")
     
-    # Ask for confirmation
-    response = input(f"\nProceed with building {len(valid_dates)} core bundles? (y/n): ").strip().lower()
-    if response != 'y':
-        print("❌ Operation cancelled by user")
-        return
+    # Ask for confirmation only when requested and a user is there to answer
+    if interactive and sys.stdin.isatty():
+        response = input(f"\nProceed with building {len(valid_dates)} core bundles? (y/n): ").strip().lower()
+        if response != 'y':
+            print("❌ Operation cancelled by user")
+            return
     
     # Step 4: Load curves into xcurves memory
     loaded_curves = load_curves_for_build_core_bundles(curves, valid_dates, currencies)
@@ -192,4 +193,11 @@ def main():
     print(f"🎯 Success rate: {bundle_results['success_rate']:.1f}%")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build core bundles for dates after the most recent core bundle")
+    parser.add_argument('--interactive', action='store_true',
+                        help="Ask for confirmation before building")
+    args = parser.parse_args()
+    
+    main(interactive=args.interactive)
@@ -1,14 +1,23 @@
 import pandas as pd
+import numpy as np
 import re
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime
 from cba.analytics import xcurves as xc
 from loader import (
-    get_bundle_name,
-    get_available_dates,
+    get_cache_snapshot,
     is_curves_loaded,
     yymmdd_to_datetime
 )
 
+# Tenor syntax patterns
+_RE_OUTRIGHT = re.compile(r'^\d+[ymd]$', re.ASCII)
+_RE_FORWARD = re.compile(r'^(\d+[ymd])(\d+[ymd])$', re.ASCII)
+_RE_DDMMYY = re.compile(r'^\d{6}$', re.ASCII)
+
 # Currency configuration with template-embedded currency codes
 CURRENCY_CONFIG = {
     # Standard AUD templates
@@ -102,12 +111,121 @@ CURRENCY_CONFIG = {
     }
 }
 
+# (template, index) per currency, interned for the xcurves calls in the pricing loops
+CURRENCY_TEMPLATES = {
+    currency: (sys.intern(config['template']), sys.intern(config['index']))
+    for currency, config in CURRENCY_CONFIG.items()
+}
+
+@lru_cache(maxsize=16384)
 def yymmdd_to_excel_date(date_str: str) -> int:
     """Convert YYMMDD to Excel date number"""
     date_obj = yymmdd_to_datetime(date_str)
     excel_epoch = datetime(1900, 1, 1)
     return (date_obj - excel_epoch).days + 2
 
+def yymmdd_batch_to_datetime(date_strs) -> pd.DatetimeIndex:
+    """Convert a sequence of YYMMDD strings to datetimes in one vectorised pass (90-99 -> 1990s, invalid -> NaT)"""
+    date_strs = pd.Index(date_strs, dtype=object)
+    century = np.where(date_strs.str[:2] >= '90', '19', '20').astype(object)
+    return pd.to_datetime(century + date_strs, format='%Y%m%d', errors='coerce')
+
+def yymmdd_batch_to_excel(date_strs) -> list:
+    """Convert a sequence of YYMMDD strings to Excel date numbers, as strings for xcurves"""
+    # Days since the Unix epoch, shifted to Excel's 1899-12-30 epoch (1970-01-01 = 25569)
+    days = yymmdd_batch_to_datetime(date_strs).values.astype('datetime64[D]').astype(np.int64) + 25569
+    return days.astype(str).tolist()
+
+@lru_cache(maxsize=8192)
+def _date_add(base: str, offset: str) -> str:
+    """Shift an Excel date by a tenor on the Sydney business-day calendar (cached, DateAdd is pure)"""
+    return str(xc.DateAdd(base, offset, "syb"))
+
+# Computed swap rate series by (currency, start, end), each stored with the cache
+# snapshot it was priced from so any bundle change invalidates it. Kept in LRU order
+# and shared by the Flask request threads, so every access holds _swap_rate_lock
+SWAP_RATE_CACHE_SIZE = 256
+_swap_rate_cache = OrderedDict()
+_swap_rate_lock = threading.Lock()
+
+# (bundle_name, template, index) combinations xcurves has reported as not built, so
+# later calls skip them instead of raising again; reset whenever the snapshot changes
+_known_missing_curves = set()
+_known_missing_snapshot = [None]
+
+def _missing_curves(snapshot) -> set:
+    """Return the known-missing curve set, emptied first if the snapshot has changed"""
+    if _known_missing_snapshot[0] is not snapshot:
+        _known_missing_curves.clear()
+        _known_missing_snapshot[0] = snapshot
+    return _known_missing_curves
+
+# Per-snapshot curve date table: (snapshot, (bundle_names, curve_dates, settlement_dates))
+_curve_date_table = [(None, None)]
+
+def _curve_dates(snapshot) -> tuple:
+    """
+    Get the bundle names, curve datetimes and settlement dates for every date in a
+    snapshot, computed once per snapshot and shared by all pricing calls
+    
+    Args:
+        snapshot: Cache snapshot from get_cache_snapshot()
+    
+    Returns:
+        tuple: (bundle_names, curve_dates, settlement_dates) in chronological order;
+               settlement dates are Excel date strings, or None where DateAdd failed
+    """
+    cached_snapshot, table = _curve_date_table[0]
+    if cached_snapshot is snapshot:
+        return table
+    
+    # Snapshot dates are in YYMMDD string order, which puts the 1990s after the 2000s;
+    # reorder the table chronologically once so every rate series comes out presorted.
+    # Impossible dates (e.g. 991332) parse to NaT and are left out with their bundles
+    curve_dates = yymmdd_batch_to_datetime(snapshot.dates)
+    valid = np.flatnonzero(~curve_dates.isna())
+    order = valid[curve_dates[valid].argsort()]
+    curve_dates = curve_dates[order]
+    available_dates = [snapshot.dates[i] for i in order]
+    bundle_names = [snapshot.cache[date_str] for date_str in available_dates]
+    
+    # Settlement is 2 business days forward of each curve date
+    settlement_dates = []
+    for date_excel in yymmdd_batch_to_excel(available_dates):
+        try:
+            settlement_dates.append(_date_add(date_excel, "2b"))
+        except Exception:
+            settlement_dates.append(None)
+    
+    table = (bundle_names, curve_dates, settlement_dates)
+    _curve_date_table[0] = (snapshot, table)
+    return table
+
+def _swap_schedule(settlement_dates, start: str, end: str) -> list:
+    """
+    Build the (settlement, swap_start, swap_end) Excel dates for each curve date
+    
+    Args:
+        settlement_dates: Settlement dates as Excel date strings (None where unknown)
+        start: Start tenor (e.g., '1y')
+        end: End tenor (e.g., '1y')
+    
+    Returns:
+        list: One tuple per curve date, or None where a date shift failed
+    """
+    schedule = []
+    for settlement_date in settlement_dates:
+        if settlement_date is None:
+            schedule.append(None)
+            continue
+        try:
+            # The tenors apply from the settlement date
+            swap_start = _date_add(settlement_date, start)
+            schedule.append((settlement_date, swap_start, _date_add(swap_start, end)))
+        except Exception:
+            schedule.append(None)
+    return schedule
+
 def swap_rate(start: str, end: str, currency: str = 'aud'):
     """
     Calculate swap rates using bundle approach (both historical and real-time)
@@ -118,54 +236,75 @@ def swap_rate(start: str, end: str, currency: str = 'aud'):
         currency: Currency code (including template, e.g., 'aud', 'audxc', 'audbs')
     
     Returns:
-        dict: Dictionary of {date: rate} pairs
+        pd.Series: Rates in percent indexed by curve date
     """
-    if currency not in CURRENCY_CONFIG:
+    try:
+        template, index = CURRENCY_TEMPLATES[currency]
+    except KeyError:
         raise ValueError(f"Unsupported currency: {currency}")
     
     if not is_curves_loaded():
         raise ValueError("Curves not loaded. Call initialize_curves() first.")
     
-    # Get configuration
-    config = CURRENCY_CONFIG[currency]
-    swap_rates = {}
+    # Reuse the series if nothing has been loaded or cleared since it was computed
+    snapshot = get_cache_snapshot()
+    cache_key = (currency, start, end)
+    with _swap_rate_lock:
+        cached = _swap_rate_cache.get(cache_key)
+        if cached is not None and cached[0] is snapshot:
+            _swap_rate_cache.move_to_end(cache_key)
+            return cached[1].copy()
+    
+    # Take every date and bundle name from the one snapshot, then work out every
+    # swap's dates before pricing any
+    bundle_names, date_objs, settlement_dates = _curve_dates(snapshot)
+    schedule = _swap_schedule(settlement_dates, start, end)
     
-    # Get all available dates
-    available_dates = get_available_dates()
+    # Raw rates go straight into preallocated arrays (scaled to percent in one step at
+    # the end); priced marks the dates that succeeded
+    rates = np.empty(len(bundle_names))
+    priced = np.zeros(len(bundle_names), dtype=bool)
+    price = xc.StandardSwapParRate
+    known_missing = _missing_curves(snapshot)
     
-    for date_str in available_dates:
+    for i, (bundle_name, swap_dates) in enumerate(zip(bundle_names, schedule)):
+        if swap_dates is None or not bundle_name:
+            continue
+        
+        missing_key = (bundle_name, template, index)
+        if missing_key in known_missing:
+            continue
+        
         try:
-            # Get bundle name for this date
-            bundle_name = get_bundle_name(date_str)
-            if not bundle_name:
-                continue
-            
-            # Convert date to datetime and Excel format
-            date_obj = yymmdd_to_datetime(date_str)
-            date_excel = str(yymmdd_to_excel_date(date_str))
-            
-            # Calculate settlement date (2 business days forward)
-            settlement_date = str(xc.DateAdd(date_excel, "2b", "syb"))
-            swap_start = str(xc.DateAdd(settlement_date, start, "syb"))
-            swap_end = str(xc.DateAdd(swap_start, end, "syb"))
+            settlement_date, swap_start, swap_end = swap_dates
 
             # Calculate swap rate using the bundle
-            rate = xc.StandardSwapParRate(
+            rate = price(
                 bundle_name,
-                config['template'],
+                template,
                 settlement_date,
                 swap_start,
                 swap_end,
-                config['index']
+                index
             )
             
-            rate_percent = float(rate) * 100
-            swap_rates[date_obj] = rate_percent
+            rates[i] = rate
+            priced[i] = True
                 
-        except Exception:
+        except Exception as e:
+            if "does not exist" in str(e):
+                known_missing.add(missing_key)
             continue
     
-    return swap_rates
+    swap_rates = pd.Series(rates[priced] * 100, index=date_objs[priced], name='Rate')
+    
+    with _swap_rate_lock:
+        _swap_rate_cache[cache_key] = (snapshot, swap_rates)
+        _swap_rate_cache.move_to_end(cache_key)
+        while len(_swap_rate_cache) > SWAP_RATE_CACHE_SIZE:
+            _swap_rate_cache.popitem(last=False)
+    
+    return swap_rates.copy()
 
 def swap_rate_fixed_date(fixed_start_date: datetime, tenor: str, currency: str = 'aud'):
     """
@@ -178,62 +317,102 @@ def swap_rate_fixed_date(fixed_start_date: datetime, tenor: str, currency: str =
         currency: Currency code (including template, e.g., 'aud', 'audxc', 'audbs')
     
     Returns:
-        dict: Dictionary of {date: rate} pairs
+        pd.Series: Rates in percent indexed by curve date
     """
-    if currency not in CURRENCY_CONFIG:
+    try:
+        template, index = CURRENCY_TEMPLATES[currency]
+    except KeyError:
         raise ValueError(f"Unsupported currency: {currency}")
     
     if not is_curves_loaded():
         raise ValueError("Curves not loaded. Call initialize_curves() first.")
     
-    # Get configuration
-    config = CURRENCY_CONFIG[currency]
-    swap_rates = {}
-    
-    # Get all available dates
-    available_dates = get_available_dates()
+    # Get all available dates from one snapshot and keep only curves dated on or before
+    # the fixed start date
+    snapshot = get_cache_snapshot()
+    bundle_names, curve_dates, settlement_dates = _curve_dates(snapshot)
+    kept = np.flatnonzero(curve_dates <= fixed_start_date)
+    curve_dates = curve_dates[kept]
+    bundle_names = [bundle_names[i] for i in kept]
+    settlement_dates = [settlement_dates[i] for i in kept]
     
     # Convert fixed start date to Excel date for xcurves
     excel_epoch = datetime(1900, 1, 1)
     fixed_start_excel = str((fixed_start_date - excel_epoch).days + 2)
     
     # Calculate fixed end date
-    fixed_end_excel = str(xc.DateAdd(fixed_start_excel, tenor, "syb"))
+    fixed_end_excel = _date_add(fixed_start_excel, tenor)
+    
+    # Raw rates go straight into preallocated arrays (scaled to percent in one step at
+    # the end); priced marks the dates that succeeded
+    rates = np.empty(len(kept))
+    priced = np.zeros(len(kept), dtype=bool)
+    price = xc.StandardSwapParRate
+    known_missing = _missing_curves(snapshot)
     
-    for date_str in available_dates:
+    for i, (bundle_name, settlement_date) in enumerate(zip(bundle_names, settlement_dates)):
+        if not bundle_name or settlement_date is None:
+            continue
+        
+        missing_key = (bundle_name, template, index)
+        if missing_key in known_missing:
+            continue
+        
         try:
-            # Convert date string to datetime
-            curve_date = yymmdd_to_datetime(date_str)
-            
-            # Skip curves where curve date > fixed start date
-            if curve_date > fixed_start_date:
-                continue
-            
-            # Get bundle name for this date
-            bundle_name = get_bundle_name(date_str)
-            if not bundle_name:
-                continue
-            
-            # Calculate settlement date for this curve
-            curve_date_excel = str(yymmdd_to_excel_date(date_str))
-            settlement_date = str(xc.DateAdd(curve_date_excel, "2b", "syb"))
-            
             # Use fixed start and end dates for the swap calculation
-            rate = xc.StandardSwapParRate(
+            rate = price(
                 bundle_name,
-                config['template'],
+                template,
                 settlement_date,
                 fixed_start_excel,
                 fixed_end_excel,
-                config['index']
+                index
             )
             
-            swap_rates[curve_date] = float(rate) * 100
+            rates[i] = rate
+            priced[i] = True
                 
-        except Exception:
+        except Exception as e:
+            if "does not exist" in str(e):
+                known_missing.add(missing_key)
             continue
     
-    return swap_rates
+    return pd.Series(rates[priced] * 100, index=curve_dates[priced], name='Rate')
+
+def _parse_tenor(tenor: str):
+    """
+    Split an outright ('10y') or forward ('5y5y') tenor into its start and end tenors
+    
+    Args:
+        tenor: Tenor string
+    
+    Returns:
+        tuple: (start, end) - outrights start at '0y' (spot)
+    """
+    if _RE_OUTRIGHT.match(tenor):
+        return "0y", tenor
+    forward = _RE_FORWARD.match(tenor)
+    if forward:
+        return forward.groups()
+    raise ValueError(f"Invalid tenor format: {tenor}. Use format like 10y, 1y1y, 5y5y, etc.")
+
+def _leg(currency: str, tenor: str) -> pd.Series:
+    """Swap rates for one already-validated currency and tenor, raising if none could be priced"""
+    start, end = _parse_tenor(tenor)
+    rates = swap_rate(start, end, currency)
+    if rates.empty:
+        raise ValueError("No swap rates calculated")
+    return rates
+
+def _align_legs(*legs) -> pd.DataFrame:
+    """Inner-join several date-indexed rate Series in a single pass, one column per leg"""
+    return pd.concat(legs, axis=1, join='inner', ignore_index=True)
+
+def _to_rate_frame(rates: pd.Series) -> pd.DataFrame:
+    """Turn a date-indexed rate Series back into a sorted Date/Rate frame (already sorted legs pass straight through)"""
+    if not rates.index.is_monotonic_increasing:
+        rates = rates.sort_index()
+    return rates.rename_axis('Date').reset_index(name='Rate')
 
 def get_swap_data(tenor_syntax: str):
     """
@@ -256,31 +435,9 @@ def get_swap_data(tenor_syntax: str):
             if currency not in CURRENCY_CONFIG:
                 raise ValueError(f"Unsupported currency: {currency}. Supported: {list(CURRENCY_CONFIG.keys())}")
             
-            # Check if it's a simple outright (e.g., "10y") or forward (e.g., "5y5y")
-            if re.match(r'^\d+[ymd]$', tenor):
-                # Simple outright: aud.10y -> start="0y", end="10y" (spot-10y rate)
-                start = "0y"
-                end = tenor
-            elif re.match(r'^\d+[ymd]\d+[ymd]$', tenor):
-                # Forward rate: aud.5y5y -> start="5y", end="5y"
-                match = re.match(r'^(\d+[ymd])(\d+[ymd])$', tenor)
-                if not match:
-                    raise ValueError(f"Could not parse tenor: {tenor}")
-                start, end = match.groups()
-            else:
-                raise ValueError(f"Invalid tenor format: {tenor}. Use format like 10y, 1y1y, 5y5y, etc.")
-            
-            # Calculate swap rates using bundles
-            rates = swap_rate(start, end, currency)
-            
-            if not rates:
-                return None, "No swap rates calculated"
-            
-            # Convert to DataFrame for easier handling
-            df = pd.DataFrame(list(rates.items()), columns=['Date', 'Rate'])
-            df = df.sort_values('Date')
-            
-            return df, None
+            # Simple outright (aud.10y -> spot-10y rate) or forward (aud.5y5y -> 5y into 5y),
+            # calculated using bundles and converted to a DataFrame for easier handling
+            return _to_rate_frame(_leg(currency, tenor)), None
             
         elif len(parts) == 3:
             currency, part1, part2 = parts
@@ -289,7 +446,7 @@ def get_swap_data(tenor_syntax: str):
                 raise ValueError(f"Unsupported currency: {currency}. Supported: {list(CURRENCY_CONFIG.keys())}")
             
             # Check if it's a fixed-date swap: aud.130526.1y (DDMMYY.tenor format)
-            if re.match(r'^\d{6}$', part1) and re.match(r'^\d+[ymd]$', part2):
+            if _RE_DDMMYY.match(part1) and _RE_OUTRIGHT.match(part2):
                 # Fixed-date swap: aud.130526.1y
                 fixed_date_str = part1  # DDMMYY format
                 tenor = part2  # e.g., "1y"
@@ -305,46 +462,19 @@ def get_swap_data(tenor_syntax: str):
                 
                 # Calculate fixed-date swap rates using bundles
                 rates = swap_rate_fixed_date(fixed_start_date, tenor, currency)
-                if not rates:
+                if rates.empty:
                     return None, "No swap rates calculated"
                 
                 # Convert to DataFrame for easier handling
-                df = pd.DataFrame(list(rates.items()), columns=['Date', 'Rate'])
-                df = df.sort_values('Date')
-                
-                return df, None
+                return _to_rate_frame(rates), None
             
             else:
-                # Spread format: aud.5y5y.10y10y (10y10y - 5y5y) or aud.5y.10y (10y - 5y, spot starting)
-                tenor1, tenor2 = part1, part2
-                
-                # Convert simple tenors to outright format if needed
-                # aud.5y.10y -> aud.0y5y.0y10y
-                if re.match(r'^\d+[ymd]$', tenor1):
-                    tenor1_formatted = f"0y{tenor1}"
-                else:
-                    tenor1_formatted = tenor1
-                    
-                if re.match(r'^\d+[ymd]$', tenor2):
-                    tenor2_formatted = f"0y{tenor2}"
-                else:
-                    tenor2_formatted = tenor2
-                
-                # Get data for both tenors
-                df1, error1 = get_swap_data(f"{currency}.{tenor1_formatted}")
-                if error1:
-                    return None, error1
-                
-                df2, error2 = get_swap_data(f"{currency}.{tenor2_formatted}")
-                if error2:
-                    return None, error2
+                # Spread format: aud.5y5y.10y10y (10y10y - 5y5y) or aud.5y.10y (10y - 5y, spot starting,
+                # i.e. aud.0y5y.0y10y)
+                legs = _align_legs(_leg(currency, part1), _leg(currency, part2))
                 
                 # Calculate spread (tenor2 - tenor1)
-                merged = pd.merge(df1, df2, on='Date', suffixes=('_1', '_2'))
-                merged['Rate'] = merged['Rate_2'] - merged['Rate_1']
-                
-                result_df = merged[['Date', 'Rate']].sort_values('Date')
-                return result_df, None
+                return _to_rate_frame(legs[1] - legs[0]), None
             
         elif len(parts) == 4:
             # Butterfly format: aud.5y5y.10y10y.20y10y (2*10y10y - 5y5y - 20y10y)
@@ -354,27 +484,10 @@ def get_swap_data(tenor_syntax: str):
                 raise ValueError(f"Unsupported currency: {currency}. Supported: {list(CURRENCY_CONFIG.keys())}")
             
             # Get data for all three tenors
-            df1, error1 = get_swap_data(f"{currency}.{tenor1}")
-            if error1:
-                return None, error1
-            
-            df2, error2 = get_swap_data(f"{currency}.{tenor2}")
-            if error2:
-                return None, error2
-                
-            df3, error3 = get_swap_data(f"{currency}.{tenor3}")
-            if error3:
-                return None, error3
+            legs = _align_legs(_leg(currency, tenor1), _leg(currency, tenor2), _leg(currency, tenor3))
             
             # Calculate butterfly (2*tenor2 - tenor1 - tenor3)
-            merged = pd.merge(df1, df2, on='Date', suffixes=('_1', '_2'))
-            merged = pd.merge(merged, df3, on='Date')
-            merged = merged.rename(columns={'Rate': 'Rate_3'})
-            
-            merged['Rate'] = 2 * merged['Rate_2'] - merged['Rate_1'] - merged['Rate_3']
-            
-            result_df = merged[['Date', 'Rate']].sort_values('Date')
-            return result_df, None
+            return _to_rate_frame(2 * legs[1] - legs[0] - legs[2]), None
             
         else:
             raise ValueError("Invalid syntax. Use format: currency.tenor (e.g., aud.1y1y, audxc.1y1y), currency.tenor1.tenor2 (spread), or currency.tenor1.tenor2.tenor3 (butterfly)")
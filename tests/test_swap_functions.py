@@ -0,0 +1,53 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _date_add(base, offset, calendar):
+    """Calendar-free DateAdd: business days and tenors as plain day counts"""
+    days = int(offset[:-1]) * {'b': 1, 'd': 1, 'm': 30, 'y': 365}[offset[-1]]
+    return int(base) + days
+
+
+@pytest.fixture(scope='module')
+def swap_functions():
+    # xcurves is a native library that is not available to the tests
+    xcurves = types.ModuleType('cba.analytics.xcurves')
+    xcurves.DateAdd = _date_add
+    analytics = types.ModuleType('cba.analytics')
+    analytics.xcurves = xcurves
+    cba = types.ModuleType('cba')
+    cba.analytics = analytics
+    saved = {name: sys.modules.get(name) for name in ('cba', 'cba.analytics', 'cba.analytics.xcurves')}
+    sys.modules.update({'cba': cba, 'cba.analytics': analytics, 'cba.analytics.xcurves': xcurves})
+    try:
+        import swap_functions
+        yield swap_functions
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def test_batch_to_datetime_marks_impossible_dates_as_nat(swap_functions):
+    dates = swap_functions.yymmdd_batch_to_datetime(['991231', '991332', '250101'])
+    assert [str(d)[:10] for d in dates] == ['1999-12-31', 'NaT', '2025-01-01']
+
+
+def test_curve_dates_drops_malformed_date(swap_functions):
+    from loader import CacheSnapshot
+
+    dates = ('250101', '250102', '991231', '991332')
+    snapshot = CacheSnapshot({d: f"{d}_core" for d in dates}, dates, True)
+
+    bundle_names, curve_dates, settlement_dates = swap_functions._curve_dates(snapshot)
+
+    assert bundle_names == ['991231_core', '250101_core', '250102_core']
+    assert [d.strftime('%y%m%d') for d in curve_dates] == ['991231', '250101', '250102']
+    assert len(settlement_dates) == 3 and None not in settlement_dates
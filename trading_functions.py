@@ -380,7 +380,7 @@ class XCSwapPosition:
             return {'pnl_array': [], 'error': error_msg}
         
         try:
-            from loader import get_available_dates, yymmdd_to_datetime
+            from loader import get_available_dates, get_bundle_name, yymmdd_to_datetime
             
             # Convert insertion_date (YYYY-MM-DD) to YYMMDD format for filtering
             if self.insertion_date:
@@ -401,7 +401,8 @@ class XCSwapPosition:
             # Get all available dates from loader
             all_dates = get_available_dates()
             
-            # Filter dates that fall within our range (inclusive)
+            # Filter dates that fall within our range (inclusive), keeping each converted
+            # date for the output
             start_dt = yymmdd_to_datetime(start_date)
             end_dt = yymmdd_to_datetime(end_date)
             
@@ -409,7 +410,7 @@ class XCSwapPosition:
             for date_str in all_dates:
                 date_dt = yymmdd_to_datetime(date_str)
                 if start_dt <= date_dt <= end_dt:
-                    filtered_dates.append(date_str)
+                    filtered_dates.append((date_dt, date_str))
             
             
             
@@ -422,9 +423,8 @@ class XCSwapPosition:
             # Calculate PnL for each date
             pnl_array = []
             
-            for date_str in sorted(filtered_dates):
+            for date_dt, date_str in sorted(filtered_dates):
                 # Get bundle name for this date
-                from loader import get_bundle_name
                 bundle_name = get_bundle_name(date_str)
                 
                 if not bundle_name:
@@ -445,8 +445,6 @@ class XCSwapPosition:
                         
                         continue
                 
-                # Convert date to datetime for output
-                date_dt = yymmdd_to_datetime(date_str)
                 pnl_array.append((date_dt, total_pnl))
                 
             